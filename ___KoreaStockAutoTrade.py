@@ -3,6 +3,9 @@ import json
 import datetime
 import time
 import yaml
+from kis_session import get_session
+from rate_limiter import TokenBucket, configure_rate_limit
+import token_cache
 
 with open('config.yaml', encoding='UTF-8') as f:
     _cfg = yaml.load(f, Loader=yaml.FullLoader)
@@ -13,25 +16,23 @@ CANO = _cfg['CANO']
 ACNT_PRDT_CD = _cfg['ACNT_PRDT_CD']
 DISCORD_WEBHOOK_URL = _cfg['DISCORD_WEBHOOK_URL']
 URL_BASE = _cfg['URL_BASE']
+configure_rate_limit(URL_BASE)
+
+# 디스코드 웹훅 전송 간격 (KIS REST 유량과 별개)
+DISCORD_RATE_PER_SEC = 10
+_discord_bucket = TokenBucket(DISCORD_RATE_PER_SEC)
 
 def send_message(msg):
     """디스코드 메세지 전송"""
     now = datetime.datetime.now()
     message = {"content": f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] {str(msg)}"}
+    _discord_bucket.acquire()
     requests.post(DISCORD_WEBHOOK_URL, data=message)
     print(message)
 
 def get_access_token():
-    """토큰 발급"""
-    headers = {"content-type":"application/json"}
-    body = {"grant_type":"client_credentials",
-    "appkey":APP_KEY, 
-    "appsecret":APP_SECRET}
-    PATH = "oauth2/tokenP"
-    URL = f"{URL_BASE}/{PATH}"
-    res = requests.post(URL, headers=headers, data=json.dumps(body))
-    ACCESS_TOKEN = res.json()["access_token"]
-    return ACCESS_TOKEN
+    """토큰 발급 (디스크 캐시 우선)"""
+    return token_cache.get_access_token(URL_BASE, APP_KEY, APP_SECRET)
     
 def hashkey(datas):
     """암호화"""
@@ -42,7 +43,7 @@ def hashkey(datas):
     'appKey' : APP_KEY,
     'appSecret' : APP_SECRET,
     }
-    res = requests.post(URL, headers=headers, data=json.dumps(datas))
+    res = get_session().post(URL, headers=headers, data=json.dumps(datas))
     hashkey = res.json()["HASH"]
     return hashkey
 
@@ -59,7 +60,7 @@ def get_current_price(code="005930"):
     "fid_cond_mrkt_div_code":"J",
     "fid_input_iscd":code,
     }
-    res = requests.get(URL, headers=headers, params=params)
+    res = get_session().get(URL, headers=headers, params=params)
     return int(res.json()['output']['stck_prpr'])
 
 def get_target_price(code="005930"):
@@ -77,7 +78,7 @@ def get_target_price(code="005930"):
     "fid_org_adj_prc":"1",
     "fid_period_div_code":"D"
     }
-    res = requests.get(URL, headers=headers, params=params)
+    res = get_session().get(URL, headers=headers, params=params)
     stck_oprc = int(res.json()['output'][0]['stck_oprc']) #오늘 시가
     stck_hgpr = int(res.json()['output'][1]['stck_hgpr']) #전일 고가
     stck_lwpr = int(res.json()['output'][1]['stck_lwpr']) #전일 저가
@@ -108,7 +109,7 @@ def get_stock_balance():
         "CTX_AREA_FK100": "",
         "CTX_AREA_NK100": ""
     }
-    res = requests.get(URL, headers=headers, params=params)
+    res = get_session().get(URL, headers=headers, params=params)
     stock_list = res.json()['output1']
     evaluation = res.json()['output2']
     stock_dict = {}
@@ -117,13 +118,9 @@ def get_stock_balance():
         if int(stock['hldg_qty']) > 0:
             stock_dict[stock['pdno']] = stock['hldg_qty']
             send_message(f"{stock['prdt_name']}({stock['pdno']}): {stock['hldg_qty']}주")
-            time.sleep(0.1)
     send_message(f"주식 평가 금액: {evaluation[0]['scts_evlu_amt']}원")
-    time.sleep(0.1)
     send_message(f"평가 손익 합계: {evaluation[0]['evlu_pfls_smtl_amt']}원")
-    time.sleep(0.1)
     send_message(f"총 평가 금액: {evaluation[0]['tot_evlu_amt']}원")
-    time.sleep(0.1)
     send_message(f"=================")
     return stock_dict
 
@@ -147,7 +144,7 @@ def get_balance():
         "CMA_EVLU_AMT_ICLD_YN": "Y",
         "OVRS_ICLD_YN": "Y"
     }
-    res = requests.get(URL, headers=headers, params=params)
+    res = get_session().get(URL, headers=headers, params=params)
     cash = res.json()['output']['ord_psbl_cash']
     send_message(f"주문 가능 현금 잔고: {cash}원")
     return int(cash)
@@ -172,7 +169,7 @@ def buy(code="005930", qty="1"):
         "custtype":"P",
         "hashkey" : hashkey(data)
     }
-    res = requests.post(URL, headers=headers, data=json.dumps(data))
+    res = get_session().post(URL, headers=headers, data=json.dumps(data))
     if res.json()['rt_cd'] == '0':
         send_message(f"[매수 성공]{str(res.json())}")
         return True
@@ -200,7 +197,7 @@ def sell(code="005930", qty="1"):
         "custtype":"P",
         "hashkey" : hashkey(data)
     }
-    res = requests.post(URL, headers=headers, data=json.dumps(data))
+    res = get_session().post(URL, headers=headers, data=json.dumps(data))
     if res.json()['rt_cd'] == '0':
         send_message(f"[매도 성공]{str(res.json())}")
         return True
@@ -4,7 +4,6 @@ import websockets
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from collections import deque
 import json
 import time
 import logging
@@ -12,6 +11,14 @@ import hashlib
 import base64
 from typing import Dict, List, Tuple, Optional
 import warnings
+import token_cache
+from rate_limiter import MOCK_RATE_PER_SEC, REAL_RATE_PER_SEC, configure_rate_limit, get_rate_limiter
+from realtime_decoder import ASP_EXCH_TIME, ASP_STOCK_CODE, ASP_TOTAL_BID_VOLUME, record_count, split_records
+from orderbook import OrderBookStore
+from tick_buffer import RingBuffer, SPREAD_DTYPE, TickStore
+from frame_recorder import FrameRecorder
+from price_store import BasketSnapshot, BasketView, PriceStore
+from ws_sessions import MAX_REGISTRATIONS_PER_SESSION, WebSocketSessionManager
 warnings.filterwarnings('ignore')
 
 # 로깅 설정
@@ -28,10 +35,14 @@ logger = logging.getLogger(__name__)
 class KISWebSocketClient:
     """한국투자증권 웹소켓 실시간 시세 클라이언트"""
     
-    def __init__(self, app_key: str, app_secret: str, is_mock: bool = True):
+    def __init__(self, app_key: str, app_secret: str, is_mock: bool = True,
+                 recorder: Optional[FrameRecorder] = None,
+                 max_registrations: int = MAX_REGISTRATIONS_PER_SESSION):
         self.app_key = app_key
         self.app_secret = app_secret
         self.is_mock = is_mock
+        self.recorder = recorder  # 수신 프레임 원본 기록기 (없으면 기록 안 함)
+        self.max_registrations = max_registrations  # 세션당 실시간 등록 한도 (넘으면 세션 추가)
         
         # WebSocket URL 설정
         if is_mock:
@@ -39,9 +50,11 @@ class KISWebSocketClient:
         else:
             self.ws_url = "ws://ops.koreainvestment.com:21000"
             
-        self.ws = None
+        self.ws = None  # WebSocketSessionManager (세션 여러 개를 하나의 연결처럼 사용)
         self.approval_key = None
-        self.price_data = {}  # 실시간 가격 저장
+        self.price_store = PriceStore()  # 종목별 최신 체결가/호가 (버전·순번, 일관된 스냅샷)
+        self.tick_history = TickStore()  # 종목별 체결/호가 이력 (링버퍼)
+        self.orderbooks = OrderBookStore()  # 종목별 10단계 호가창 (NumPy 배열, 제자리 갱신)
         self.subscribed_stocks = set()
         self.callbacks = {}  # 종목별 콜백 함수
         
@@ -52,20 +65,12 @@ class KISWebSocketClient:
         else:
             base_url = "https://openapi.koreainvestment.com:9443"
             
-        url = f"{base_url}/oauth2/Approval"
-        headers = {"content-type": "application/json"}
-        body = {
-            "grant_type": "client_credentials",
-            "appkey": self.app_key,
-            "secretkey": self.app_secret
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=body) as response:
-                data = await response.json()
-                self.approval_key = data["approval_key"]
-                logger.info(f"웹소켓 접속키 발급 완료: {self.approval_key[:10]}...")
-                return self.approval_key
+        # 디스크 캐시 우선 (파일 I/O·발급은 스레드에서 실행)
+        self.approval_key = await asyncio.to_thread(
+            token_cache.get_approval_key, base_url, self.app_key, self.app_secret
+        )
+        logger.info(f"웹소켓 접속키 준비 완료: {self.approval_key[:10]}...")
+        return self.approval_key
                 
     def create_subscribe_message(self, stock_code: str, tr_type: str = "1"):
         """실시간 시세 구독 메시지 생성"""
@@ -109,166 +114,145 @@ class KISWebSocketClient:
             "body": body
         })
         
+    def subscribe_messages(self, stock_code: str, tr_type: str = "1") -> List[str]:
+        """종목 1개의 실시간 체결가 + 호가 등록/해제 메시지"""
+        return [
+            self.create_subscribe_message(stock_code, tr_type),
+            self.create_orderbook_subscribe_message(stock_code, tr_type),
+        ]
+        
     def decrypt_message(self, encrypted_msg: str) -> str:
         """AES256 메시지 복호화"""
         # 실시간 시세는 평문으로 오므로 그대로 반환
         return encrypted_msg
         
     async def connect(self):
-        """웹소켓 연결"""
+        """웹소켓 연결 (구독이 세션 한도를 넘으면 subscribe 에서 세션을 추가로 엶)"""
         await self.get_approval_key()
         
-        self.ws = await websockets.connect(
+        if self.ws is not None:
+            await self.ws.close()
+        self.ws = WebSocketSessionManager(
             self.ws_url,
-            ping_interval=30,
-            ping_timeout=10
+            self.subscribe_messages,
+            feeds_per_symbol=2,  # 체결가 + 호가
+            max_registrations=self.max_registrations,
         )
+        await self.ws.open_session()
         
         logger.info(f"웹소켓 연결 성공: {self.ws_url}")
         
     async def subscribe(self, stock_codes: List[str]):
-        """종목 구독"""
+        """종목 구독 (세션당 등록 한도에 맞춰 여러 세션에 분산)"""
         if not self.ws:
             await self.connect()
             
-        for code in stock_codes:
-            if code not in self.subscribed_stocks:
-                # 실시간 체결가 구독
-                msg = self.create_subscribe_message(code)
-                await self.ws.send(msg)
-                
-                # 실시간 호가 구독
-                msg_orderbook = self.create_orderbook_subscribe_message(code)
-                await self.ws.send(msg_orderbook)
-                
-                self.subscribed_stocks.add(code)
-                logger.info(f"종목 구독: {code}")
-                
-                await asyncio.sleep(0.1)  # 구독 간 짧은 대기
+        await self.ws.subscribe(stock_codes)
+        new_codes = [code for code in stock_codes if code not in self.subscribed_stocks]
+        self.subscribed_stocks.update(stock_codes)
+        if new_codes:
+            logger.info(f"종목 구독: {len(new_codes)}개 (세션별 종목 수: {self.ws.stats()})")
                 
     async def unsubscribe(self, stock_codes: List[str]):
-        """종목 구독 해제"""
-        for code in stock_codes:
-            if code in self.subscribed_stocks:
-                msg = self.create_subscribe_message(code, tr_type="2")
-                await self.ws.send(msg)
-                self.subscribed_stocks.remove(code)
-                logger.info(f"종목 구독 해제: {code}")
+        """종목 구독 해제 (세션이 남으면 종목을 재배치하고 빈 세션을 닫음)"""
+        codes = [code for code in stock_codes if code in self.subscribed_stocks]
+        if not codes:
+            return
+        await self.ws.unsubscribe(codes)
+        self.subscribed_stocks.difference_update(codes)
+        logger.info(f"종목 구독 해제: {len(codes)}개 (세션별 종목 수: {self.ws.stats()})")
                 
-    def parse_realtime_price(self, data: str) -> Dict:
-        """실시간 체결가 파싱 - 한국투자증권 실제 형식"""
+    def parse_realtime_price(self, data: str) -> List[Dict]:
+        """실시간 체결가/호가 파싱 - 한국투자증권 실제 형식
+
+        한 프레임에 여러 레코드가 묶여 올 수 있으므로(parts[2] = 건수) 레코드별 결과 목록을 반환
+        """
         try:
-            parts = data.split("|")
+            parts = data.split("|", 3)
             
             if len(parts) < 4:
-                return {}
+                return []
                 
             # 헤더 정보
-            tr_id = parts[1] if len(parts) > 1 else ""
+            tr_id = parts[1]
             
-            if tr_id == "H0STCNT0":  # 실시간 체결가
-                # 실제 데이터는 parts[3]에 있음
-                data_str = parts[3] if len(parts) > 3 else ""
-                
-                # 데이터 파싱 (한투 실제 포맷)
-                # 데이터는 ^ 구분자로 되어 있음
-                fields = data_str.split("^") if "^" in data_str else [data_str]
-                
-                if len(fields) >= 10:
-                    stock_code = fields[0] if fields[0] else ""
-                    
-                    # 안전한 파싱
-                    try:
-                        # 체결시간
-                        exec_time = fields[1] if len(fields) > 1 else ""
-                        # 현재가 (체결가)
-                        current_price = int(fields[2].replace(",", "")) if len(fields) > 2 and fields[2].replace(",", "").isdigit() else 0
-                        # 전일대비
-                        change = int(fields[3].replace(",", "")) if len(fields) > 3 and fields[3].replace(",", "").replace("-", "").isdigit() else 0
-                        # 등락률
-                        change_rate = float(fields[4].replace("%", "")) if len(fields) > 4 and fields[4].replace("%", "").replace("-", "").replace(".", "").isdigit() else 0
-                        # 체결량
-                        volume = int(fields[5].replace(",", "")) if len(fields) > 5 and fields[5].replace(",", "").isdigit() else 0
-                        # 누적거래량
-                        total_volume = int(fields[6].replace(",", "")) if len(fields) > 6 and fields[6].replace(",", "").isdigit() else 0
-                        
-                        if stock_code and current_price > 0:
-                            return {
-                                "stock_code": stock_code[:6],  # 종목코드 6자리
-                                "price": current_price,
-                                "volume": volume,
-                                "total_volume": total_volume,
-                                "change": change,
-                                "change_rate": change_rate,
-                                "time": exec_time
-                            }
-                    except (ValueError, IndexError) as e:
-                        logger.debug(f"체결가 파싱 오류: {e}, 데이터: {fields[:7]}")
-                        
-            elif tr_id == "H0STASP0":  # 실시간 호가
-                data_str = parts[3] if len(parts) > 3 else ""
-                fields = data_str.split("^") if "^" in data_str else [data_str]
-                
-                if len(fields) >= 20:
-                    stock_code = fields[0] if fields[0] else ""
-                    
-                    try:
-                        # 호가 시간
-                        quote_time = fields[1] if len(fields) > 1 else ""
-                        
-                        # 매도호가 (1~10)
-                        ask_prices = []
-                        ask_volumes = []
-                        for i in range(10):
-                            price_idx = 2 + i * 2
-                            volume_idx = 3 + i * 2
-                            if len(fields) > volume_idx:
-                                price = int(fields[price_idx].replace(",", "")) if fields[price_idx].replace(",", "").isdigit() else 0
-                                volume = int(fields[volume_idx].replace(",", "")) if fields[volume_idx].replace(",", "").isdigit() else 0
-                                if price > 0:
-                                    ask_prices.append(price)
-                                    ask_volumes.append(volume)
-                                    
-                        # 매수호가 (1~10) 
-                        bid_prices = []
-                        bid_volumes = []
-                        for i in range(10):
-                            price_idx = 22 + i * 2
-                            volume_idx = 23 + i * 2
-                            if len(fields) > volume_idx:
-                                price = int(fields[price_idx].replace(",", "")) if fields[price_idx].replace(",", "").isdigit() else 0
-                                volume = int(fields[volume_idx].replace(",", "")) if fields[volume_idx].replace(",", "").isdigit() else 0
-                                if price > 0:
-                                    bid_prices.append(price)
-                                    bid_volumes.append(volume)
-                                    
-                        if stock_code and ask_prices and bid_prices:
-                            return {
-                                "stock_code": stock_code[:6],
-                                "ask_price": ask_prices[0] if ask_prices else 0,  # 1호가
-                                "bid_price": bid_prices[0] if bid_prices else 0,  # 1호가
-                                "ask_volume": ask_volumes[0] if ask_volumes else 0,
-                                "bid_volume": bid_volumes[0] if bid_volumes else 0,
-                                "time": quote_time
-                            }
-                    except (ValueError, IndexError) as e:
-                        logger.debug(f"호가 파싱 오류: {e}")
+            if tr_id in ("H0STCNT0", "H0STASP0"):  # 실시간 체결가 / 호가
+                # 데이터는 parts[3]에 ^ 구분자로 레코드가 이어져 있음
+                start = len(data) - len(parts[3])
+                parse_fields = self._parse_trade_fields if tr_id == "H0STCNT0" else self._parse_quote_fields
+                records = [parse_fields(fields) for fields in split_records(data, start, record_count(parts[2]))]
+                return [record for record in records if record]
                         
             # pingpong 메시지 처리
             elif tr_id == "PINGPONG":
                 logger.debug("Ping-Pong 메시지 수신")
-                return {"type": "pingpong"}
+                return [{"type": "pingpong"}]
                 
             # 시스템 메시지
             elif parts[0] in ["0", "1"]:
-                if len(parts) > 2:
-                    msg = parts[2] if len(parts) > 2 else ""
-                    logger.debug(f"시스템 메시지: {msg}")
-                    return {"type": "system", "message": msg}
+                msg = parts[2]
+                logger.debug(f"시스템 메시지: {msg}")
+                return [{"type": "system", "message": msg}]
                     
         except Exception as e:
             logger.debug(f"메시지 파싱 실패: {e}, 원본: {data[:100]}")
             
+        return []
+        
+    def _parse_trade_fields(self, fields: List[str]) -> Dict:
+        """체결가(H0STCNT0) 레코드 하나 파싱"""
+        if len(fields) >= 10:
+            stock_code = fields[0] if fields[0] else ""
+            
+            # 안전한 파싱
+            try:
+                # 체결시간
+                exec_time = fields[1] if len(fields) > 1 else ""
+                # 현재가 (체결가)
+                current_price = int(fields[2].replace(",", "")) if len(fields) > 2 and fields[2].replace(",", "").isdigit() else 0
+                # 전일대비
+                change = int(fields[3].replace(",", "")) if len(fields) > 3 and fields[3].replace(",", "").replace("-", "").isdigit() else 0
+                # 등락률
+                change_rate = float(fields[4].replace("%", "")) if len(fields) > 4 and fields[4].replace("%", "").replace("-", "").replace(".", "").isdigit() else 0
+                # 체결량
+                volume = int(fields[5].replace(",", "")) if len(fields) > 5 and fields[5].replace(",", "").isdigit() else 0
+                # 누적거래량
+                total_volume = int(fields[6].replace(",", "")) if len(fields) > 6 and fields[6].replace(",", "").isdigit() else 0
+                
+                if stock_code and current_price > 0:
+                    return {
+                        "stock_code": stock_code[:6],  # 종목코드 6자리
+                        "price": current_price,
+                        "volume": volume,
+                        "total_volume": total_volume,
+                        "change": change,
+                        "change_rate": change_rate,
+                        "time": exec_time
+                    }
+            except (ValueError, IndexError) as e:
+                logger.debug(f"체결가 파싱 오류: {e}, 데이터: {fields[:7]}")
+        return {}
+        
+    def _parse_quote_fields(self, fields: List[str]) -> Dict:
+        """호가(H0STASP0) 레코드 하나 파싱 - 10단계 호가는 self.orderbooks 에 갱신하고 1호가만 반환"""
+        if len(fields) > ASP_TOTAL_BID_VOLUME:
+            stock_code = fields[ASP_STOCK_CODE][:6]
+            
+            try:
+                book = self.orderbooks.update(stock_code, fields)
+            except ValueError as e:
+                logger.debug(f"호가 파싱 오류: {e}")
+                return {}
+                
+            if stock_code and book.ready:
+                return {
+                    "stock_code": stock_code,
+                    "ask_price": book.best_ask(),  # 1호가
+                    "bid_price": book.best_bid(),  # 1호가
+                    "ask_volume": int(book.ask_volumes[0]),
+                    "bid_volume": int(book.bid_volumes[0]),
+                    "time": fields[ASP_EXCH_TIME]
+                }
         return {}
         
     async def listen(self):
@@ -287,11 +271,15 @@ class KISWebSocketClient:
                         await self.subscribe(stocks_to_resubscribe)
                     
                 message = await self.ws.recv()
+                # 세션 관리자가 프레임 도착 시 찍은 시각 사용 (병합 큐 대기 시간 제외)
+                recv_ns = getattr(self.ws, "last_recv_ns", None) or time.monotonic_ns()
+                if self.recorder is not None:
+                    self.recorder.record(message, recv_ns)
                 
                 # 메시지 파싱
-                parsed_data = self.parse_realtime_price(message)
-                
-                if parsed_data:
+                updates = []  # 프레임 단위로 가격 저장소에 한 번에 반영
+                records = []
+                for parsed_data in self.parse_realtime_price(message):
                     # pingpong 메시지 처리
                     if parsed_data.get("type") == "pingpong":
                         await self.ws.pong()
@@ -304,13 +292,22 @@ class KISWebSocketClient:
                     # 가격 데이터 처리
                     if "stock_code" in parsed_data:
                         stock_code = parsed_data["stock_code"]
-                        
-                        # 가격 데이터 업데이트
-                        if stock_code not in self.price_data:
-                            self.price_data[stock_code] = {}
-                            
-                        # 기존 데이터와 병합 (호가와 체결가 모두 유지)
-                        self.price_data[stock_code].update(parsed_data)
+                        updates.append((
+                            stock_code,
+                            parsed_data.get("price"),
+                            parsed_data.get("ask_price"),
+                            parsed_data.get("bid_price"),
+                        ))
+                        records.append(parsed_data)
+                        exch_time = parsed_data.get("time", "")
+                        self.tick_history.append_tick(
+                            stock_code, recv_ns,
+                            exch_time=int(exch_time) if exch_time.isdigit() else None,
+                            price=parsed_data.get("price"),
+                            volume=parsed_data.get("volume", 0),
+                            bid=parsed_data.get("bid_price"),
+                            ask=parsed_data.get("ask_price"),
+                        )
                         
                         # 로그 (디버그용 - 운영시 제거)
                         if "price" in parsed_data:
@@ -318,15 +315,22 @@ class KISWebSocketClient:
                         elif "ask_price" in parsed_data:
                             logger.debug(f"호가 업데이트 - {stock_code}: 매도 {parsed_data['ask_price']:,} / 매수 {parsed_data['bid_price']:,}")
                             
-                        # 콜백 실행
-                        if stock_code in self.callbacks:
-                            await self.callbacks[stock_code](parsed_data)
+                if updates:
+                    # 저장소 반영 후 콜백 실행 (콜백에서는 항상 이 프레임까지 반영된 값을 봄)
+                    self.price_store.apply(updates)
+                    for parsed_data in records:
+                        callback = self.callbacks.get(parsed_data["stock_code"])
+                        if callback is not None:
+                            await callback(parsed_data)
                             
                 # 재연결 카운터 리셋
                 reconnect_count = 0
                         
             except websockets.exceptions.ConnectionClosed:
                 logger.warning(f"웹소켓 연결 종료, 재연결 시도... ({reconnect_count + 1}/{max_reconnect})")
+                # 세션 관리자를 닫아 남은 세션의 수신·재연결 태스크까지 정리한 뒤 새로 연결
+                if self.ws is not None:
+                    await self.ws.close()
                 self.ws = None
                 reconnect_count += 1
                 await asyncio.sleep(5 * reconnect_count)  # 재연결 간격 증가
@@ -366,25 +370,22 @@ class KISAPI:
         self.token = None
         self.token_expire = None
         
+        # 모든 주문/조회는 전역 토큰 버킷을 거쳐 나감
+        configure_rate_limit(rate=MOCK_RATE_PER_SEC if is_mock else REAL_RATE_PER_SEC)
+        
     async def get_token(self):
         """접근 토큰 발급"""
         if self.token and self.token_expire and datetime.now() < self.token_expire:
             return self.token
             
-        url = f"{self.base_url}/oauth2/tokenP"
-        headers = {"content-type": "application/json"}
-        body = {
-            "grant_type": "client_credentials",
-            "appkey": self.app_key,
-            "appsecret": self.app_secret
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=body) as response:
-                data = await response.json()
-                self.token = data["access_token"]
-                self.token_expire = datetime.now() + timedelta(seconds=data["expires_in"] - 60)
-                return self.token
+        # 디스크 캐시 우선 (파일 I/O·발급은 스레드에서 실행)
+        self.token = await asyncio.to_thread(
+            token_cache.get_access_token, self.base_url, self.app_key, self.app_secret
+        )
+        self.token_expire = datetime.now() + timedelta(seconds=token_cache.seconds_until_refresh(
+            "access_token", self.base_url, self.app_key
+        ))
+        return self.token
                 
     async def buy_order(self, stock_code, quantity, price=None):
         """매수 주문"""
@@ -408,12 +409,13 @@ class KISAPI:
             "ORD_UNPR": str(price) if price else "0"
         }
         
+        await get_rate_limiter().acquire_async()
         async with aiohttp.ClientSession() as session:
             async with session.post(url, headers=headers, json=body) as response:
                 data = await response.json()
                 if data["rt_cd"] == "0":
                     logger.info(f"매수 주문 성공: {stock_code} {quantity}주")
-                    return data["output"]["ORD_NO"]
+                    return data["output"]["ODNO"]
                 else:
                     logger.error(f"매수 주문 실패: {stock_code} - {data['msg1']}")
                     return None
@@ -440,12 +442,13 @@ class KISAPI:
             "ORD_UNPR": str(price) if price else "0"
         }
         
+        await get_rate_limiter().acquire_async()
         async with aiohttp.ClientSession() as session:
             async with session.post(url, headers=headers, json=body) as response:
                 data = await response.json()
                 if data["rt_cd"] == "0":
                     logger.info(f"매도 주문 성공: {stock_code} {quantity}주")
-                    return data["output"]["ORD_NO"]
+                    return data["output"]["ODNO"]
                 else:
                     logger.error(f"매도 주문 실패: {stock_code} - {data['msg1']}")
                     return None
@@ -480,6 +483,9 @@ class ETFArbitrageTrader:
         # 모든 종목 코드 리스트 (ETF + 구성종목)
         self.all_codes = [self.etf_code] + list(self.components.values())
         
+        # ETF + 구성종목 가격 스냅샷 (웹소켓 가격 저장소의 해당 종목 행만 복사)
+        self.basket = BasketView(ws_client.price_store, self.etf_code, self.components.values())
+        
         # ETF 구성비중 (예시값 - 실제값으로 업데이트 필요)
         self.weights = {
             "005930": 0.50,  # 삼성전자
@@ -501,7 +507,7 @@ class ETFArbitrageTrader:
         
         # 트레이딩 파라미터
         self.basket_size = 20000000  # 바스켓 크기: 2천만원
-        self.spread_history = deque(maxlen=100)  # 최근 100개 스프레드 기록
+        self.spread_history = RingBuffer(100, SPREAD_DTYPE)  # 최근 100개 스프레드 기록
         self.position = None  # 현재 포지션
         self.entry_spread = None  # 진입 시 스프레드
         
@@ -535,29 +541,9 @@ class ETFArbitrageTrader:
                 basket_value += prices[code] * weight * 10000  # ETF 1주당 가치
         return basket_value
         
-    def get_realtime_prices(self) -> Dict[str, float]:
-        """웹소켓에서 실시간 가격 가져오기"""
-        prices = {}
-        
-        # ETF 가격
-        if self.etf_code in self.ws_client.price_data:
-            etf_data = self.ws_client.price_data[self.etf_code]
-            if "price" in etf_data and etf_data["price"] > 0:
-                prices["ETF"] = etf_data["price"]
-                # 호가 정보가 있으면 사용, 없으면 현재가 사용
-                prices[f"{self.etf_code}_ask"] = etf_data.get("ask_price", etf_data["price"])
-                prices[f"{self.etf_code}_bid"] = etf_data.get("bid_price", etf_data["price"])
-                
-        # 구성종목 가격
-        for name, code in self.components.items():
-            if code in self.ws_client.price_data:
-                stock_data = self.ws_client.price_data[code]
-                if "price" in stock_data and stock_data["price"] > 0:
-                    prices[code] = stock_data["price"]
-                    prices[f"{code}_ask"] = stock_data.get("ask_price", stock_data["price"])
-                    prices[f"{code}_bid"] = stock_data.get("bid_price", stock_data["price"])
-                    
-        return prices
+    def get_realtime_prices(self) -> BasketSnapshot:
+        """웹소켓에서 실시간 가격 가져오기 (ETF + 구성종목의 같은 시점 스냅샷, 키는 기존 가격 dict 와 동일)"""
+        return self.basket.snapshot()
         
     async def calculate_spread(self, prices: Dict[str, float]) -> float:
         """스프레드(괴리율) 계산"""
@@ -573,11 +559,12 @@ class ETFArbitrageTrader:
         
     def update_statistics(self, spread: float):
         """통계 업데이트"""
-        self.spread_history.append(spread)
+        self.spread_history.append((time.monotonic_ns(), spread))
         
         if len(self.spread_history) >= 20:
-            self.spread_mean = np.mean(self.spread_history)
-            self.spread_std = np.std(self.spread_history)
+            spreads = self.spread_history.column("spread")
+            self.spread_mean = spreads.mean()
+            self.spread_std = spreads.std()
             
     def calculate_z_score(self, spread: float) -> float:
         """Z-score 계산"""
@@ -642,7 +629,6 @@ class ETFArbitrageTrader:
                     quantity,
                     prices[f"{code}_ask"]
                 )
-                await asyncio.sleep(0.2)  # 주문 간 대기
                 
         self.position = {
             "type": position_type,
@@ -683,7 +669,6 @@ class ETFArbitrageTrader:
                     quantity,
                     prices[f"{code}_bid"]
                 )
-                await asyncio.sleep(0.2)  # 주문 간 대기
                 
         # 수익률 계산
         pnl = self.calculate_pnl(prices)
@@ -914,11 +899,15 @@ async def main():
     # 모의투자 여부
     IS_MOCK = True
     
+    # 수신 프레임 원본 기록 위치 (예: "recordings". None 이면 기록 안 함)
+    RECORD_DIR = None
+    
     # KIS API 초기화 (주문용)
     kis_api = KISAPI(APP_KEY, APP_SECRET, ACCOUNT_NO, is_mock=IS_MOCK)
     
-    # 웹소켓 클라이언트 초기화 (실시간 시세용)
-    ws_client = KISWebSocketClient(APP_KEY, APP_SECRET, is_mock=IS_MOCK)
+    # 웹소켓 클라이언트 초기화 (실시간 시세용, RECORD_DIR 을 지정하면 수신 프레임 기록)
+    recorder = FrameRecorder("stock_auto_mcp", RECORD_DIR).start() if RECORD_DIR else None
+    ws_client = KISWebSocketClient(APP_KEY, APP_SECRET, is_mock=IS_MOCK, recorder=recorder)
     
     # 트레이더 초기화
     trader = ETFArbitrageTrader(kis_api, ws_client)
@@ -930,6 +919,9 @@ async def main():
         logger.error(f"메인 함수 오류: {e}")
     finally:
         await ws_client.close()
+        if recorder is not None:
+            recorder.close()
+            logger.info(f"수신 프레임 {recorder.frames:,}건 기록: {recorder.path}")
         
 if __name__ == "__main__":
     # 이벤트 루프 실행
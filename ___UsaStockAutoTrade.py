@@ -4,6 +4,7 @@ import datetime
 from pytz import timezone
 import time
 import yaml
+import token_cache
 
 with open('config.yaml', encoding='UTF-8') as f:
     _cfg = yaml.load(f, Loader=yaml.FullLoader)
@@ -23,16 +24,8 @@ def send_message(msg):
     print(message)
 
 def get_access_token():
-    """토큰 발급"""
-    headers = {"content-type":"application/json"}
-    body = {"grant_type":"client_credentials",
-    "appkey":APP_KEY, 
-    "appsecret":APP_SECRET}
-    PATH = "oauth2/tokenP"
-    URL = f"{URL_BASE}/{PATH}"
-    res = requests.post(URL, headers=headers, data=json.dumps(body))
-    ACCESS_TOKEN = res.json()["access_token"]
-    return ACCESS_TOKEN
+    """토큰 발급 (디스크 캐시 우선)"""
+    return token_cache.get_access_token(URL_BASE, APP_KEY, APP_SECRET)
     
 def hashkey(datas):
     """암호화"""
@@ -1,5 +1,6 @@
 import requests
 import json
+import token_cache
 import hashlib
 
 # ========== 설정 ==========
@@ -16,29 +17,12 @@ BASE_URL = "https://openapivts.koreainvestment.com:29443"  # 모의투자 서버
 # ========== 1. 접근 토큰 발급 ==========
 def get_access_token():
     """
-    OAuth 인증을 통해 접근 토큰을 발급받습니다.
+    접근 토큰을 디스크 캐시에서 가져오거나 새로 발급받습니다.
     """
-    url = f"{BASE_URL}/oauth2/tokenP"
-    
-    headers = {
-        "content-type": "application/json"
-    }
-    
-    data = {
-        "grant_type": "client_credentials",
-        "appkey": APP_KEY,
-        "appsecret": APP_SECRET
-    }
-    
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    
-    if response.status_code == 200:
-        access_token = response.json()["access_token"]
-        print(f"✅ 접근 토큰 발급 성공")
-        return access_token
-    else:
-        print(f"❌ 접근 토큰 발급 실패: {response.text}")
-        return None
+    access_token = token_cache.get_access_token(BASE_URL, APP_KEY, APP_SECRET)
+    if access_token:
+        print(f"✅ 접근 토큰 준비 완료")
+    return access_token
 
 
 # ========== 2. 해시키 생성 (POST 요청 시 필요) ==========
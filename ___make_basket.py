@@ -5,6 +5,8 @@ import threading
 from typing import Dict, List, Tuple
 from queue import Queue
 import websocket
+import token_cache
+from rate_limiter import MOCK_RATE_PER_SEC, REAL_RATE_PER_SEC, configure_rate_limit, get_rate_limiter
 
 class SamsungETFBasketTrader:
     """Kodex 삼성그룹 ETF 바스켓 매수 클래스 (웹소켓 + REST API)"""
@@ -29,6 +31,7 @@ class SamsungETFBasketTrader:
         self.api_secret = secret
         self.total_investment = total_investment_amount
         self.mock = mock
+        configure_rate_limit(rate=MOCK_RATE_PER_SEC if mock else REAL_RATE_PER_SEC)
         
         # ETF 구성종목
         self.constituents = [
@@ -73,28 +76,12 @@ class SamsungETFBasketTrader:
             url = "https://openapi.koreainvestment.com:9443" if not self.mock else \
                   "https://openapivts.koreainvestment.com:29443"
             
-            import requests
-            headers = {
-                "content-type": "application/json"
-            }
-            body = {
-                "grant_type": "client_credentials",
-                "appkey": self.api_key,
-                "secretkey": self.api_secret
-            }
-            
-            response = requests.post(
-                f"{url}/oauth2/Approval",
-                headers=headers,
-                data=json.dumps(body)
-            )
-            
-            if response.status_code == 200:
-                approval_key = response.json()['approval_key']
-                print(f"✅ 웹소켓 접속키 발급 완료: {approval_key[:20]}...")
+            approval_key = token_cache.get_approval_key(url, self.api_key, self.api_secret)
+            if approval_key:
+                print(f"✅ 웹소켓 접속키 준비 완료: {approval_key[:20]}...")
                 return approval_key
             else:
-                raise Exception(f"접속키 발급 실패: {response.text}")
+                raise Exception("접속키 발급 실패")
                 
         except Exception as e:
             print(f"❌ 웹소켓 접속키 발급 오류: {e}")
@@ -277,14 +264,12 @@ class SamsungETFBasketTrader:
         return basket_info
     
     def execute_basket_order(self, 
-                            basket_info: List[Tuple[str, str, int, int, int]],
-                            order_delay: float = 0.2) -> Dict:
+                            basket_info: List[Tuple[str, str, int, int, int]]) -> Dict:
         """
-        REST API를 통한 바스켓 주문 실행
+        REST API를 통한 바스켓 주문 실행 (호출 간격은 전역 토큰 버킷이 관리)
         
         Args:
             basket_info: 매수 정보
-            order_delay: 주문 간 딜레이 (초)
         """
         order_results = {
             "success": [],
@@ -301,6 +286,9 @@ class SamsungETFBasketTrader:
                 continue
             
             try:
+                # API 호출 제한: 토큰이 생길 때까지만 대기
+                get_rate_limiter().acquire()
+                
                 # REST API로 시장가 매수 주문
                 resp = self.broker.create_market_buy_order(
                     symbol=stock_code,
@@ -327,9 +315,6 @@ class SamsungETFBasketTrader:
                     })
                     print(f"❌ {stock_name:15s} | 주문 실패: {error_msg}")
                 
-                # API 호출 제한 방지를 위한 딜레이
-                time.sleep(order_delay)
-                
             except Exception as e:
                 order_results["failed"].append({
                     "stock_name": stock_name,
@@ -342,15 +327,13 @@ class SamsungETFBasketTrader:
     
     def create_basket(self, 
                      composition_ratios: Dict[str, float],
-                     timeout: int = 60,
-                     order_delay: float = 0.2) -> Dict:
+                     timeout: int = 60) -> Dict:
         """
         ETF 바스켓 생성 (웹소켓 + REST API)
         
         Args:
             composition_ratios: 구성비율
             timeout: 시세 수신 대기 시간 (초)
-            order_delay: 주문 간 딜레이 (초)
         """
         print("=" * 80)
         print("Kodex 삼성그룹 ETF 바스켓 매수 시작")
@@ -385,7 +368,7 @@ class SamsungETFBasketTrader:
             # 3. REST API로 주문 실행
             print("\n[3단계] REST API 주문 실행")
             print("-" * 80)
-            order_results = self.execute_basket_order(basket_info, order_delay=order_delay)
+            order_results = self.execute_basket_order(basket_info)
             
             # 4. 웹소켓 종료
             self.stop_websocket()
@@ -451,8 +434,7 @@ if __name__ == "__main__":
     # 바스켓 생성 실행
     results = trader.create_basket(
         composition_ratios=composition_ratios,
-        timeout=60,  # 시세 수신 대기 60초
-        order_delay=0.2  # 주문 간 0.2초 딜레이
+        timeout=60  # 시세 수신 대기 60초
     )
     
     # 결과 저장
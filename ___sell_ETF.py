@@ -1,6 +1,7 @@
-import requests
 import json
-import time
+import token_cache
+from kis_session import get_session
+from rate_limiter import configure_rate_limit
 
 # ========== 설정 ==========
 # KIS Developers에서 발급받은 정보를 입력하세요
@@ -13,37 +14,19 @@ ACCOUNT_PRODUCT_CD = "01"  # 계좌번호 뒤 2자리 (종합계좌: 01)
 BASE_URL = "https://openapivts.koreainvestment.com:29443"  # 모의투자 서버
 # 실전투자 시: "https://openapi.koreainvestment.com:9443"
 
-# API 호출 제한 설정
-API_DELAY = 0.2  # 각 API 호출 사이에 0.2초 대기
+# API 호출 제한 설정 (모든 REST 호출은 전역 토큰 버킷을 거쳐 나감)
+configure_rate_limit(BASE_URL)
 
 
 # ========== 1. 접근 토큰 발급 ==========
 def get_access_token():
     """
-    OAuth 인증을 통해 접근 토큰을 발급받습니다.
+    접근 토큰을 디스크 캐시에서 가져오거나 새로 발급받습니다.
     """
-    url = f"{BASE_URL}/oauth2/tokenP"
-    
-    headers = {
-        "content-type": "application/json"
-    }
-    
-    data = {
-        "grant_type": "client_credentials",
-        "appkey": APP_KEY,
-        "appsecret": APP_SECRET
-    }
-    
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    time.sleep(API_DELAY)
-    
-    if response.status_code == 200:
-        access_token = response.json()["access_token"]
-        print(f"✅ 접근 토큰 발급 성공")
-        return access_token
-    else:
-        print(f"❌ 접근 토큰 발급 실패: {response.text}")
-        return None
+    access_token = token_cache.get_access_token(BASE_URL, APP_KEY, APP_SECRET)
+    if access_token:
+        print(f"✅ 접근 토큰 준비 완료")
+    return access_token
 
 
 # ========== 2. 해시키 생성 (POST 요청 시 필요) ==========
@@ -59,8 +42,7 @@ def get_hashkey(data):
         "appsecret": APP_SECRET
     }
     
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    time.sleep(API_DELAY)
+    response = get_session().post(url, headers=headers, data=json.dumps(data))
     
     if response.status_code == 200:
         hashkey = response.json()["HASH"]
@@ -90,8 +72,7 @@ def get_current_price(access_token, stock_code="102780"):
         "FID_INPUT_ISCD": stock_code
     }
     
-    response = requests.get(url, headers=headers, params=params)
-    time.sleep(API_DELAY)
+    response = get_session().get(url, headers=headers, params=params)
     
     if response.status_code == 200:
         data = response.json()
@@ -137,8 +118,7 @@ def get_stock_balance(access_token, stock_code="102780"):
         "CTX_AREA_NK100": ""  # 연속조회키100
     }
     
-    response = requests.get(url, headers=headers, params=params)
-    time.sleep(API_DELAY)
+    response = get_session().get(url, headers=headers, params=params)
     
     if response.status_code == 200:
         data = response.json()
@@ -204,8 +184,7 @@ def get_sellable_quantity(access_token, stock_code="102780"):
         "OVRS_ICLD_YN": "N"  # 해외포함여부
     }
     
-    response = requests.get(url, headers=headers, params=params)
-    time.sleep(API_DELAY)
+    response = get_session().get(url, headers=headers, params=params)
     
     if response.status_code == 200:
         data = response.json()
@@ -269,8 +248,7 @@ def sell_stock(access_token, stock_code="102780", quantity=1, price=0, order_typ
         "hashkey": hashkey
     }
     
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    time.sleep(API_DELAY)
+    response = get_session().post(url, headers=headers, data=json.dumps(data))
     
     if response.status_code == 200:
         result = response.json()
@@ -3,6 +3,7 @@ import json
 import time
 import threading
 from datetime import datetime
+from conflating_queue import ConflatingQueue
 
 # 한국투자증권 웹소켓 설정
 WS_URL = "ws://ops.koreainvestment.com:21000"  # 실전투자
@@ -13,18 +14,12 @@ APP_SECRET = "IKYQPBpDdEOAMXJnbpcXViuQVAYz5/08dY/hDMayaOpQ1at0MogvxPmQct6q9wGTI8
 # 종목 정보
 STOCK_CODE = "102780"  # KODEX 삼성그룹
 
-# 실시간 데이터 저장
-realtime_data = {
-    "nav": None,
-    "current_price": None,
-    "nav_time": None,
-    "price_time": None
-}
+# 실시간 데이터 전달 큐 (웹소켓 스레드 → 출력 스레드, 키별 최신 값만 유지)
+# 키: "nav" / "current_price", 값: (값, 수신 시각 문자열)
+signal_queue = ConflatingQueue(maxsize=16)
 
 def on_message(ws, message):
-    """웹소켓 메시지 수신 처리 (수정된 버전)"""
-    global realtime_data  # 👈 1. 전역 변수 realtime_data를 사용하겠다고 선언!
-
+    """웹소켓 메시지 수신 처리 (수신 값은 전달 큐에 넣고 바로 반환)"""
     try:
         # PING/PONG 처리 (API 서버와의 연결 유지를 위해 필요)
         if message == "PINGPONG":
@@ -43,16 +38,14 @@ def on_message(ws, message):
                 if len(fields) > 1:
                     # 👈 2. NAV 값은 두 번째 필드(인덱스 1)에 있습니다.
                     nav_value = fields[1]
-                    realtime_data["nav"] = float(nav_value)
-                    realtime_data["nav_time"] = datetime.now().strftime("%H:%M:%S")
+                    signal_queue.put("nav", (float(nav_value), datetime.now().strftime("%H:%M:%S")))
 
             # 실시간 주식 체결가 (H0STCNT0)
             elif tr_id == "H0STCNT0":
                 fields = data_str.split('^')
                 if len(fields) > 2:
                     current_price = fields[2]  # 현재가는 3번째 필드 (인덱스 2) - 올바름
-                    realtime_data["current_price"] = int(current_price)
-                    realtime_data["price_time"] = datetime.now().strftime("%H:%M:%S")
+                    signal_queue.put("current_price", (int(current_price), datetime.now().strftime("%H:%M:%S")))
 
         # JSON 형태의 응답 메시지 (구독 성공/실패 등)
         elif message.startswith('{'):
@@ -120,13 +113,16 @@ def on_open(ws):
     print(f"[구독 요청] 현재가 (H0STCNT0) - {STOCK_CODE}")
 
 def print_data():
-    """1초마다 데이터 출력 및 조건 확인"""
+    """1초마다 전달 큐의 최신 값을 반영하여 데이터 출력 및 조건 확인"""
+    nav, nav_time = None, "-"
+    price, price_time = None, "-"
     while True:
         time.sleep(1)
-        nav = realtime_data.get("nav") # .get()의 기본값 None을 활용
-        price = realtime_data.get("current_price")
-        nav_time = realtime_data.get("nav_time", "-")
-        price_time = realtime_data.get("price_time", "-")
+        batch = signal_queue.get_batch(0)
+        if "nav" in batch:
+            nav, nav_time = batch["nav"]
+        if "current_price" in batch:
+            price, price_time = batch["current_price"]
         
         # 기본 정보 출력
         print(f"\n[{datetime.now().strftime('%H:%M:%S')}] KODEX 삼성그룹 (102780)")
@@ -147,6 +143,7 @@ def print_data():
             elif diff < 0:
                 print("  >> end")
         
+        print(f"  수신 큐: {signal_queue.format_stats()}")
         print("-" * 50)
 
 def main():
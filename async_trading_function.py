@@ -0,0 +1,113 @@
+import asyncio
+import aiohttp
+import trading_function
+from trading_function import encode_body, get_order_template, lookup_hashkey, store_hashkey
+from rate_limiter import get_rate_limiter
+
+# ==============================================================================
+# ========== trading_function 의 asyncio 버전 ==========
+# ==============================================================================
+# 이벤트 루프 하나에서 웹소켓 수신과 주문을 함께 처리할 수 있도록,
+# 하나의 장기 세션(keep-alive)을 공유하여 여러 주문을 동시에 전송합니다.
+CONNECTION_LIMIT = 16          # 전체 동시 연결 수
+CONNECTION_LIMIT_PER_HOST = 8  # 호스트당 동시 연결 수
+KEEPALIVE_TIMEOUT = 60         # 유휴 연결 유지 시간 (초)
+REQUEST_TIMEOUT = 10           # 요청 전체 타임아웃 (초)
+
+_session = None
+
+
+async def get_async_session():
+    """공유 aiohttp 세션 반환 (현재 이벤트 루프에서 최초 호출 시 생성)"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+        )
+    return _session
+
+
+async def close_async_session():
+    """공유 세션 종료 (이벤트 루프 종료 전에 호출)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def async_get_hashkey(data, base_url, app_key, app_secret):
+    """POST 요청시 필요한 해시키 생성 (비동기)"""
+    url = f"{base_url}/uapi/hashkey"
+    headers = {
+        "content-type": "application/json",
+        "appkey": app_key,
+        "appsecret": app_secret,
+    }
+    session = await get_async_session()
+    await get_rate_limiter().acquire_async()
+    async with session.post(url, headers=headers, data=encode_body(data)) as response:
+        if response.status == 200:
+            result = await response.json(content_type=None)
+            return result.get("HASH")
+        print(f"❌ 해시키 생성 실패: {await response.text()}")
+        return None
+
+# --------------------------------------------------------------
+async def _async_order_cash(access_token, base_url, app_key, app_secret, account_no,
+                            stock_code, quantity, tr_id, side_name):
+    """현금 시장가 주문 공통 처리 (비동기)"""
+    template = get_order_template(base_url, access_token, app_key, app_secret, account_no, stock_code, tr_id)
+    if template is None:
+        return None
+
+    body = template.render(quantity)
+    headers = template.headers
+
+    # trading_function 과 같은 해시키 스위치/캐시를 사용
+    if trading_function.USE_HASHKEY:
+        hashkey = lookup_hashkey(body, app_key)
+        if hashkey is None:
+            hashkey = await async_get_hashkey(body, base_url, app_key, app_secret)
+            if not hashkey:
+                return None
+            store_hashkey(body, app_key, hashkey)
+        headers = dict(headers, hashkey=hashkey)
+
+    session = await get_async_session()
+    await get_rate_limiter().acquire_async()
+    async with session.post(template.url, headers=headers, data=body) as response:
+        if response.status == 200:
+            result = await response.json(content_type=None)
+            if result.get("rt_cd") == "0":
+                odno = result.get("output", {}).get("ODNO")
+                print(f"✅ {side_name} 주문 성공! {stock_code} (주문번호: {odno})")
+            else:
+                print(f"❌ {side_name} 주문 실패: {stock_code} {result.get('msg1')}")
+            return result
+        print(f"❌ {side_name} API 호출 실패: {await response.text()}")
+        return None
+
+# --------------------------------------------------------------
+async def async_buy_etf(access_token, base_url, app_key, app_secret, account_no, stock_code, quantity, stock_name, tr_id="VTTC0802U"):
+    """시장가 매수 주문 (비동기)"""
+    print(f"\n>>>> 🛒 {stock_name} {quantity}주 시장가 매수 주문 실행!")
+    return await _async_order_cash(access_token, base_url, app_key, app_secret, account_no,
+                                   stock_code, quantity, tr_id, "매수")
+
+# --------------------------------------------------------------
+async def async_sell_etf(access_token, base_url, app_key, app_secret, account_no, stock_code, quantity, stock_name, tr_id="VTTC0801U"):
+    """시장가 매도 주문 (비동기)"""
+    print(f"\n>>>> 💰 {stock_name} {quantity}주 시장가 매도 주문 실행!")
+    return await _async_order_cash(access_token, base_url, app_key, app_secret, account_no,
+                                   stock_code, quantity, tr_id, "매도")
+
+# --------------------------------------------------------------
+async def submit_orders(*order_coros):
+    """여러 주문 코루틴을 동시에 전송하고 입력 순서대로 결과 반환 (예외는 결과로 반환)"""
+    return await asyncio.gather(*order_coros, return_exceptions=True)
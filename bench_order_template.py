@@ -0,0 +1,54 @@
+import json
+import timeit
+from trading_function import build_order_body, get_order_template
+
+# ==============================================================================
+# ========== 주문 요청 생성 CPU 비용 비교 (템플릿 도입 전/후) ==========
+# ==============================================================================
+# 네트워크 없이 주문 1건의 헤더·본문을 만드는 데 드는 시간만 측정합니다.
+BASE_URL = "https://openapivts.koreainvestment.com:29443"
+ACCESS_TOKEN = "x" * 350
+APP_KEY = "PSVP4uaIGfmv9oviIqOjn58WIV3coGzjAEqu"
+APP_SECRET = "s" * 180
+ACCOUNT_NO = "50154524-01"
+STOCK_CODE = "102780"
+TR_ID = "VTTC0802U"
+HASHKEY = "h" * 64
+NUMBER = 200_000
+
+
+def build_before(quantity):
+    """템플릿 도입 전: 매 주문마다 계좌 분리·dict 생성·json.dumps"""
+    data = build_order_body(ACCOUNT_NO, STOCK_CODE, quantity)
+    headers = {
+        "content-type": "application/json",
+        "authorization": f"Bearer {ACCESS_TOKEN}",
+        "appkey": APP_KEY,
+        "appsecret": APP_SECRET,
+        "tr_id": TR_ID,
+        "custtype": "P",
+        "hashkey": HASHKEY,
+    }
+    return f"{BASE_URL}/uapi/domestic-stock/v1/trading/order-cash", headers, json.dumps(data)
+
+
+def build_after(quantity):
+    """템플릿 사용: 캐시 조회 후 수량만 채움"""
+    template = get_order_template(BASE_URL, ACCESS_TOKEN, APP_KEY, APP_SECRET, ACCOUNT_NO, STOCK_CODE, TR_ID)
+    return template.url, dict(template.headers, hashkey=HASHKEY), template.render(quantity)
+
+
+if __name__ == "__main__":
+    # 두 방식이 같은 본문을 만드는지 먼저 확인
+    assert build_before(3)[2].encode() == build_after(3)[2]
+
+    before = timeit.timeit(lambda: build_before(1), number=NUMBER) / NUMBER * 1e9
+    after = timeit.timeit(lambda: build_after(1), number=NUMBER) / NUMBER * 1e9
+
+    print("=" * 50)
+    print(f"주문 요청 생성 비용 ({NUMBER:,}회 평균)")
+    print("=" * 50)
+    print(f"템플릿 전 : {before:>8.0f} ns/주문")
+    print(f"템플릿 후 : {after:>8.0f} ns/주문")
+    print(f"절감      : {before - after:>8.0f} ns/주문 ({(1 - after / before) * 100:.1f}%)")
+    print("=" * 50)
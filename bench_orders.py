@@ -0,0 +1,282 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import trading_function
+from trading_function import buy_etf, sell_etf, buy_basket, sell_basket
+from async_trading_function import async_buy_etf, async_sell_etf, close_async_session
+from kis_session import close_session
+from rate_limiter import configure_rate_limit
+from latency import LatencyHistogram
+from kis_stub_server import StubConfig, start_stub_server
+
+# ==============================================================================
+# ========== 주문 경로 벤치마크 (로컬 KIS 스텁 서버 대상) ==========
+# ==============================================================================
+# 동기 / 스레드 / asyncio 주문 경로와 바스켓 주문을 같은 조건으로 돌려
+# 초당 주문 수, p50/p99/p999 지연, 주문당 메모리 증가량(스냅샷 비교)과 최대 추적 메모리를 비교합니다.
+# --baseline 으로 이전 결과 JSON 을 주면 허용 범위를 넘는 성능 저하 시 종료코드 1 을 반환합니다.
+ACCESS_TOKEN = "bench-token"
+APP_KEY = "BENCH-APP-KEY"
+APP_SECRET = "BENCH-APP-SECRET"
+ACCOUNT_NO = "50000000-01"
+STOCK_CODE = "102780"
+STOCK_NAME = "KODEX 삼성그룹"
+VARIANTS = ("sync", "threaded", "asyncio", "kisapi", "basket")
+
+_loop = None   # asyncio 계열 변형이 공유하는 이벤트 루프 (세션 재사용)
+_kisapi = None
+
+
+# ---------------- 주문 1건 ----------------
+def _sync_order(base_url, i):
+    order = buy_etf if i % 2 == 0 else sell_etf
+    result = order(ACCESS_TOKEN, base_url, APP_KEY, APP_SECRET, ACCOUNT_NO, STOCK_CODE, 1, STOCK_NAME)
+    return result is not None and result.get("rt_cd") == "0"
+
+
+async def _async_order(base_url, i):
+    order = async_buy_etf if i % 2 == 0 else async_sell_etf
+    result = await order(ACCESS_TOKEN, base_url, APP_KEY, APP_SECRET, ACCOUNT_NO, STOCK_CODE, 1, STOCK_NAME)
+    return result is not None and result.get("rt_cd") == "0"
+
+
+async def _kisapi_order(base_url, i):
+    order = _kisapi.buy_order if i % 2 == 0 else _kisapi.sell_order
+    return await order(STOCK_CODE, 1) is not None
+
+
+def _basket_df(legs):
+    return pd.DataFrame({
+        "종목명": [f"구성종목{k}" for k in range(legs)],
+        "종목코드": [f"{100000 + k:06d}" for k in range(legs)],
+        "수량": [1] * legs,
+    })
+
+
+# ---------------- 변형별 실행 (→ 지연 목록(ns), 실패 건수) ----------------
+def run_sync(base_url, n, concurrency, basket_legs):
+    latencies, errors = [], 0
+    for i in range(n):
+        t0 = time.perf_counter_ns()
+        ok = _sync_order(base_url, i)
+        latencies.append(time.perf_counter_ns() - t0)
+        errors += not ok
+    return latencies, errors
+
+
+def run_threaded(base_url, n, concurrency, basket_legs):
+    def timed(i):
+        t0 = time.perf_counter_ns()
+        ok = _sync_order(base_url, i)
+        return time.perf_counter_ns() - t0, ok
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(n)))
+    return [ns for ns, _ in results], sum(not ok for _, ok in results)
+
+
+async def _gather_timed(order_func, base_url, n, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i):
+        async with semaphore:
+            t0 = time.perf_counter_ns()
+            ok = await order_func(base_url, i)
+            return time.perf_counter_ns() - t0, ok
+
+    results = await asyncio.gather(*(timed(i) for i in range(n)))
+    return [ns for ns, _ in results], sum(not ok for _, ok in results)
+
+
+def run_asyncio(base_url, n, concurrency, basket_legs):
+    return _loop.run_until_complete(_gather_timed(_async_order, base_url, n, concurrency))
+
+
+def run_kisapi(base_url, n, concurrency, basket_legs):
+    return _loop.run_until_complete(_gather_timed(_kisapi_order, base_url, n, concurrency))
+
+
+def run_basket(base_url, n, concurrency, basket_legs):
+    """바스켓 단위로 반복 (지연은 종목별 주문 기준)"""
+    basket_df = _basket_df(basket_legs)
+    latencies, errors = [], 0
+    for i in range(max(1, n // basket_legs)):
+        order = buy_basket if i % 2 == 0 else sell_basket
+        result = order(ACCESS_TOKEN, base_url, APP_KEY, APP_SECRET, ACCOUNT_NO, basket_df, max_in_flight=concurrency)
+        latencies.extend(int(leg["elapsed_ms"] * 1e6) for leg in result["legs"])
+        errors += len(result["failed"])
+    return latencies, errors
+
+
+RUNNERS = {
+    "sync": run_sync,
+    "threaded": run_threaded,
+    "asyncio": run_asyncio,
+    "kisapi": run_kisapi,
+    "basket": run_basket,
+}
+
+
+# ---------------- 측정 ----------------
+def _snapshot():
+    # tracemalloc 자신의 할당은 제외
+    return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+
+def measure_allocations(runner, base_url, n, concurrency, basket_legs):
+    """tracemalloc 스냅샷 비교로 주문당 (증가 KB, 증가 블록 수) 와 실행 중 최대 추적 메모리 KB (주문 수로 나누지 않음)
+
+    최대값은 동시에 처리 중인 주문 수에 따라 달라지므로 변형 간 주문당 비교에는 증가량을 사용합니다.
+    """
+    tracemalloc.start()
+    try:
+        before = _snapshot()
+        current_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        latencies, _ = runner(base_url, n, concurrency, basket_legs)
+        _, peak = tracemalloc.get_traced_memory()
+        diff = _snapshot().compare_to(before, "filename")
+    finally:
+        tracemalloc.stop()
+    orders = max(1, len(latencies))
+    size_diff = sum(stat.size_diff for stat in diff)
+    count_diff = sum(stat.count_diff for stat in diff)
+    return size_diff / 1024 / orders, count_diff / orders, (peak - current_before) / 1024
+
+
+def run_variant(name, base_url, args):
+    runner = RUNNERS[name]
+    concurrency = 1 if name == "sync" else args.concurrency
+    runner(base_url, args.warmup, concurrency, args.basket_legs)  # 연결·템플릿·해시키 캐시 준비
+
+    start_ns = time.perf_counter_ns()
+    latencies, errors = runner(base_url, args.orders, concurrency, args.basket_legs)
+    elapsed_ns = time.perf_counter_ns() - start_ns
+
+    retained_kb, retained_blocks, peak_kb = measure_allocations(runner, base_url, args.alloc_orders, concurrency, args.basket_legs)
+
+    hist = LatencyHistogram()
+    for ns in latencies:
+        hist.record(ns)
+    return {
+        "orders": len(latencies),
+        "errors": errors,
+        "orders_per_sec": len(latencies) / (elapsed_ns / 1e9),
+        "p50_ms": hist.percentile(50) / 1e6,
+        "p99_ms": hist.percentile(99) / 1e6,
+        "p999_ms": hist.percentile(99.9) / 1e6,
+        "retained_kb_per_order": retained_kb,
+        "retained_blocks_per_order": retained_blocks,
+        "peak_kb": peak_kb,
+    }
+
+
+def print_report(results):
+    print("\n" + "=" * 107)
+    print(f"{'변형':10s} | {'주문':>6s} | {'실패':>4s} | {'주문/초':>9s} | {'p50(ms)':>8s} | {'p99(ms)':>8s} | "
+          f"{'p999(ms)':>8s} | {'KB/주문':>8s} | {'블록/주문':>8s} | {'최대KB':>8s}")
+    print("-" * 107)
+    for name, r in results.items():
+        print(f"{name:10s} | {r['orders']:>6d} | {r['errors']:>4d} | {r['orders_per_sec']:>9.1f} | "
+              f"{r['p50_ms']:>8.3f} | {r['p99_ms']:>8.3f} | {r['p999_ms']:>8.3f} | "
+              f"{r['retained_kb_per_order']:>8.2f} | {r['retained_blocks_per_order']:>8.1f} | {r['peak_kb']:>8.1f}")
+    print("=" * 107)
+
+
+def check_regressions(results, baseline, tolerance):
+    """기준 결과 대비 처리량 감소·p99 증가가 허용 범위를 넘은 항목 목록"""
+    problems = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if r["orders_per_sec"] < base["orders_per_sec"] * (1 - tolerance):
+            problems.append(f"{name}: 주문/초 {base['orders_per_sec']:.1f} → {r['orders_per_sec']:.1f}")
+        if r["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p99 {base['p99_ms']:.3f}ms → {r['p99_ms']:.3f}ms")
+    return problems
+
+
+def main():
+    global _loop, _kisapi
+    parser = argparse.ArgumentParser(description="주문 경로 벤치마크 (로컬 KIS 스텁 서버)")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help=f"쉼표로 구분 ({','.join(VARIANTS)})")
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--alloc-orders", type=int, default=100, help="할당량 측정용 주문 수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--basket-legs", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="스텁 서버 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=0, help="클라이언트 유량 제한 (0: 사실상 해제)")
+    parser.add_argument("--no-hashkey", action="store_true")
+    parser.add_argument("--json", help="결과 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 성능 저하 비율")
+    args = parser.parse_args()
+
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        parser.error(f"알 수 없는 변형: {', '.join(sorted(unknown))}")
+
+    server = start_stub_server(config=StubConfig(args.latency_ms, args.jitter_ms))
+    base_url = server.base_url
+    trading_function.USE_HASHKEY = not args.no_hashkey
+
+    _loop = asyncio.new_event_loop()
+    if "kisapi" in variants:
+        from ___StockAutoByMCP import KISAPI
+        logging.getLogger("___StockAutoByMCP").setLevel(logging.CRITICAL)
+        _kisapi = KISAPI(APP_KEY, APP_SECRET, ACCOUNT_NO.replace("-", ""), is_mock=True)
+        _kisapi.base_url = base_url
+        _kisapi.token = ACCESS_TOKEN
+        _kisapi.token_expire = datetime.now() + timedelta(days=1)
+    # KISAPI 생성자가 유량을 다시 설정하므로 그 뒤에 적용
+    rate = args.rate or 1e9
+    configure_rate_limit(rate=rate, burst=max(1, int(min(rate, 1e6))))
+
+    print(f"🧪 스텁 서버 {base_url} | 변형 {', '.join(variants)} | 주문 {args.orders}건 | 동시 {args.concurrency}")
+    results = {}
+    try:
+        for name in variants:
+            # 주문 함수의 진행 출력은 측정에서 제외
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results[name] = run_variant(name, base_url, args)
+            print(f"  {name:10s} 완료: {results[name]['orders_per_sec']:.1f} 주문/초")
+    finally:
+        _loop.run_until_complete(close_async_session())
+        _loop.close()
+        close_session()
+        server.shutdown()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = check_regressions(results, json.load(f), args.tolerance)
+        if problems:
+            print("❌ 성능 저하 감지:")
+            for line in problems:
+                print(f"   - {line}")
+            sys.exit(1)
+        print("✅ 기준 대비 성능 저하 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import random
+import timeit
+from frame_recorder import MAGIC, read_frames
+from realtime_decoder import DECODERS, frame_header
+
+# ==============================================================================
+# ========== 실시간 시세 디코더 비교 (fast vs split) ==========
+# ==============================================================================
+# --frames 로 수신 프레임 기록 파일(.kisfrm, frame_recorder) 또는 한 줄에 하나씩 저장한 텍스트 파일을 주면 그 프레임으로,
+# 없으면 실제 형식(H0STCNT0 46필드, H0STNAV0 8필드)의 합성 프레임으로 측정합니다.
+NUMBER = 200_000
+CNT_FIELD_COUNT = 46
+NAV_FIELD_COUNT = 8
+
+
+def synthetic_frames(count=1000, seed=0):
+    rng = random.Random(seed)
+    frames = []
+    for i in range(count):
+        hhmmss = f"09{i // 60 % 60:02d}{i % 60:02d}"
+        if i % 2 == 0:
+            price = 15000 + rng.randint(-50, 50) * 5
+            fields = ["102780", hhmmss, str(price)] + [str(rng.randint(0, 99999)) for _ in range(CNT_FIELD_COUNT - 3)]
+            frames.append("0|H0STCNT0|001|" + "^".join(fields))
+        else:
+            nav = f"{15000 + rng.uniform(-250, 250):.2f}"
+            fields = ["102780", nav] + [f"{rng.uniform(0, 100):.2f}" for _ in range(NAV_FIELD_COUNT - 2)]
+            frames.append("0|H0STNAV0|001|" + "^".join(fields))
+    return frames
+
+
+def load_frames(path):
+    """기록 파일이면 read_frames 로, 아니면 한 줄에 한 프레임인 텍스트로 읽음"""
+    with open(path, "rb") as f:
+        recorded = f.read(len(MAGIC)) == MAGIC
+    if recorded:
+        return [frame for _, _, frame in read_frames(path) if frame[:2] in ("0|", "1|")]
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line[:2] in ("0|", "1|")]
+
+
+def bench(frames, mode, number):
+    prepared = [(DECODERS[tr_id][mode], frame, start)
+                for frame in frames
+                for tr_id, _, start in [frame_header(frame)]
+                if tr_id in DECODERS]
+
+    def run():
+        for decoder, frame, start in prepared:
+            decoder(frame, start)
+
+    loops = max(1, number // len(prepared))
+    return timeit.timeit(run, number=loops) / (loops * len(prepared)) * 1e9
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="실시간 시세 디코더 비교")
+    parser.add_argument("--frames", help="수신 프레임 기록 파일(.kisfrm) 또는 텍스트 파일 (한 줄에 한 프레임)")
+    parser.add_argument("--number", type=int, default=NUMBER)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames) if args.frames else synthetic_frames()
+    frames = [f for f in frames if frame_header(f)[0] in DECODERS]
+    if not frames:
+        raise SystemExit("비교할 H0STCNT0/H0STNAV0 프레임이 없습니다.")
+
+    # 두 구현이 같은 결과를 내는지 먼저 확인
+    for frame in frames:
+        tr_id, _, start = frame_header(frame)
+        assert DECODERS[tr_id]["fast"](frame, start) == DECODERS[tr_id]["split"](frame, start), frame
+
+    split_ns = bench(frames, "split", args.number)
+    fast_ns = bench(frames, "fast", args.number)
+
+    print("=" * 50)
+    print(f"시세 프레임 디코딩 비용 ({len(frames):,}개 프레임, {args.number:,}회 기준)")
+    print("=" * 50)
+    print(f"split : {split_ns:>8.0f} ns/프레임")
+    print(f"fast  : {fast_ns:>8.0f} ns/프레임")
+    print(f"절감  : {split_ns - fast_ns:>8.0f} ns/프레임 ({(1 - fast_ns / split_ns) * 100:.1f}%)")
+    print("=" * 50)
@@ -0,0 +1,76 @@
+import argparse
+import json
+import time
+import yaml
+import trading_function
+from kis_session import get_session, warm_up
+from trading_function import buy_etf, clear_hashkey_cache, prefetch_hashkey
+
+# ==============================================================================
+# ========== 해시키 모드별 주문 지연 비교 ==========
+# ==============================================================================
+# 1) fresh : 주문마다 해시키 요청 (기존 방식)
+# 2) cached: 미리 받아둔 해시키 재사용
+# 3) off   : 해시키 없이 주문
+# ⚠️ 실제 주문이 나가므로 모의투자 서버나 로컬 스텁 서버에서만 실행하세요.
+
+with open('config.yaml', encoding='UTF-8') as f:
+    _cfg = yaml.load(f, Loader=yaml.FullLoader)
+APP_KEY = _cfg['APP_KEY']
+APP_SECRET = _cfg['APP_SECRET']
+ACCOUNT_NO = f"{_cfg['CANO']}-{_cfg['ACNT_PRDT_CD']}"
+
+
+def get_access_token(base_url):
+    """접근 토큰 발급"""
+    headers = {"content-type": "application/json"}
+    body = {"grant_type": "client_credentials", "appkey": APP_KEY, "appsecret": APP_SECRET}
+    res = get_session().post(f"{base_url}/oauth2/tokenP", headers=headers, data=json.dumps(body))
+    return res.json()["access_token"]
+
+
+def percentile(samples, pct):
+    """정렬된 표본에서 백분위 값 (ms)"""
+    if not samples:
+        return 0.0
+    idx = min(len(samples) - 1, int(len(samples) * pct / 100))
+    return samples[idx]
+
+
+def run_mode(mode, base_url, access_token, stock_code, count):
+    """모드별로 count 번 주문하고 지연 시간(ms) 목록 반환"""
+    trading_function.USE_HASHKEY = mode != "off"
+    if mode == "cached":
+        prefetch_hashkey(base_url, APP_KEY, APP_SECRET, ACCOUNT_NO, stock_code, 1)
+
+    samples = []
+    for _ in range(count):
+        if mode == "fresh":
+            clear_hashkey_cache()
+        start = time.perf_counter()
+        buy_etf(access_token, base_url, APP_KEY, APP_SECRET, ACCOUNT_NO, stock_code, 1, stock_code)
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="해시키 모드별 주문 지연 비교")
+    parser.add_argument("--base-url", default=_cfg['URL_BASE'])
+    parser.add_argument("--stock-code", default="102780")
+    parser.add_argument("--count", type=int, default=20)
+    args = parser.parse_args()
+
+    warm_up(args.base_url)
+    token = get_access_token(args.base_url)
+
+    results = {}
+    for mode in ("fresh", "cached", "off"):
+        results[mode] = run_mode(mode, args.base_url, token, args.stock_code, args.count)
+
+    print("\n" + "=" * 60)
+    print(f"{'모드':8s} | {'p50(ms)':>10s} | {'p99(ms)':>10s} | {'평균(ms)':>10s}")
+    print("=" * 60)
+    for mode, samples in results.items():
+        avg = sum(samples) / len(samples) if samples else 0.0
+        print(f"{mode:8s} | {percentile(samples, 50):>10.2f} | {percentile(samples, 99):>10.2f} | {avg:>10.2f}")
+    print("=" * 60)
@@ -0,0 +1,76 @@
+import threading
+
+# ==============================================================================
+# ========== 수신 스레드 → 전략 스레드 전달 큐 (키별 최신 값 병합) ==========
+# ==============================================================================
+# 수신 스레드는 put() 으로 (키, 값)을 넣고 바로 반환합니다. (전략 처리 때문에 막히지 않음)
+# 같은 키(예: ("nav", 종목번호))가 아직 처리되지 않았으면 값만 최신으로 바꾸므로,
+# 대기 항목 수는 키 개수를 넘지 않고 전략은 항상 최신 값만 처리합니다.
+# 서로 다른 키가 maxsize 개 쌓인 상태에서 새 키가 오면 버리고 dropped 로 셉니다.
+DEFAULT_MAXSIZE = 4096
+
+
+class ConflatingQueue:
+    """키별 최신 값만 남기는 유한 크기 전달 큐 (생산자 여러 개 + 소비자 1개)"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._pending = {}  # 키 → 최신 값 (처음 도착한 순서 유지)
+        self._cond = threading.Condition(threading.Lock())
+        # 지표
+        self.puts = 0        # put 호출 수
+        self.conflated = 0   # 처리 전 같은 키의 값을 덮어쓴 수
+        self.dropped = 0     # 큐가 가득 차 버린 수
+        self.batches = 0     # get_batch 로 꺼낸 묶음 수
+        self.max_depth = 0   # 최대 대기 키 수
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, key, value):
+        """값 넣기 (막히지 않음). 버려졌으면 False"""
+        with self._cond:
+            self.puts += 1
+            pending = self._pending
+            if key in pending:
+                pending[key] = value
+                self.conflated += 1
+                return True
+            if len(pending) >= self.maxsize:
+                self.dropped += 1
+                return False
+            pending[key] = value
+            depth = len(pending)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            if depth == 1:
+                self._cond.notify()
+            return True
+
+    def get_batch(self, timeout=None):
+        """대기 중인 {키: 최신 값} 을 모두 꺼냄 (없으면 timeout 초까지 대기, 그래도 없으면 빈 dict)"""
+        with self._cond:
+            if not self._pending and timeout != 0:
+                self._cond.wait_for(lambda: self._pending, timeout=timeout)
+            batch = self._pending
+            if not batch:
+                return {}  # 대기 dict 자체를 넘기면 락 밖에서 put 과 경합하므로 새 dict 반환
+            self._pending = {}
+            self.batches += 1
+            return batch
+
+    def stats(self):
+        with self._cond:
+            return {
+                "depth": len(self._pending),
+                "max_depth": self.max_depth,
+                "puts": self.puts,
+                "conflated": self.conflated,
+                "dropped": self.dropped,
+                "batches": self.batches,
+            }
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"대기 {s['depth']} (최대 {s['max_depth']}) | 수신 {s['puts']:,} | "
+                f"병합 {s['conflated']:,} | 버림 {s['dropped']:,} | 처리 묶음 {s['batches']:,}")
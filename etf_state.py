@@ -0,0 +1,66 @@
+import numpy as np
+
+# ==============================================================================
+# ========== 종목 인덱스 기반 ETF 상태 테이블 ==========
+# ==============================================================================
+# 종목마다 dict 를 두지 않고 필드별 NumPy 배열을 종목 번호(slot)로 접근합니다.
+# 틱 처리 비용은 종목 수와 무관하게 dict 조회 1번 + 배열 쓰기 몇 번입니다.
+
+
+class EtfStateTable:
+    """ETF 목록(etf_table)의 NAV/현재가/기준값/포지션 상태
+
+    etf_table 항목: {"code", "name", "buy_spread", "sell_spread", "quantity"}
+      매수: NAV - 현재가 >= buy_spread (미보유 시)
+      매도: NAV - 현재가 <  sell_spread (보유 시)
+    """
+
+    def __init__(self, etf_table):
+        self.codes = [e["code"] for e in etf_table]
+        self.names = [e.get("name", e["code"]) for e in etf_table]
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        n = len(self.codes)
+
+        # 시세 (매매 스레드가 전달 큐에서 꺼내 기록)
+        self.nav = np.full(n, np.nan)
+        self.price = np.full(n, np.nan)
+        self.nav_recv_ns = np.zeros(n, dtype=np.int64)      # time.monotonic_ns
+        self.price_recv_ns = np.zeros(n, dtype=np.int64)
+        self.price_exch_time = np.zeros(n, dtype=np.int32)  # HHMMSS
+
+        # 매매 기준 / 포지션 (매매 스레드가 기록)
+        self.buy_spread = np.array([e["buy_spread"] for e in etf_table], dtype=np.float64)
+        self.sell_spread = np.array([e["sell_spread"] for e in etf_table], dtype=np.float64)
+        self.quantity = np.array([e.get("quantity", 1) for e in etf_table], dtype=np.int64)
+        self.holding = np.zeros(n, dtype=bool)
+        self.last_order_ns = np.zeros(n, dtype=np.int64)  # 마지막 주문 시도(전송·완료) 시각, monotonic_ns
+
+        # 연결 끊김 시각 (0: 정상). 이후 NAV·현재가가 모두 새로 들어올 때까지 STALE
+        self.stale_ns = np.zeros(n, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def slot(self, code):
+        """종목코드 → 번호 (대상이 아니면 None)"""
+        return self.index.get(code)
+
+    def has_quotes(self, i):
+        return not (np.isnan(self.nav[i]) or np.isnan(self.price[i]))
+
+    def spread(self, i):
+        """NAV - 현재가 (시세 미수신이면 nan)"""
+        return self.nav[i] - self.price[i]
+
+    def quote_age_ms(self, i, now_ns):
+        """NAV·현재가 중 오래된 쪽의 경과 시간 (ms)"""
+        return (now_ns - min(self.nav_recv_ns[i], self.price_recv_ns[i])) / 1e6
+
+    def mark_stale(self, now_ns):
+        """연결 끊김: 이미 STALE 인 종목은 처음 끊긴 시각을 유지"""
+        self.stale_ns[self.stale_ns == 0] = now_ns
+
+    def is_stale(self, i):
+        """끊김 이후 NAV 또는 현재가가 아직 새로 수신되지 않았는지"""
+        stale_ns = self.stale_ns[i]
+        return stale_ns != 0 and min(self.nav_recv_ns[i], self.price_recv_ns[i]) <= stale_ns
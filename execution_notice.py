@@ -0,0 +1,208 @@
+import json
+import threading
+import time
+from base64 import b64decode
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+from latency import order_latency
+
+# ==============================================================================
+# ========== 실시간 체결통보 (H0STCNI0 / 모의 H0STCNI9) ==========
+# ==============================================================================
+# 구독 응답으로 받은 AES256 key/iv 로 암호화된 통보를 복호화하여
+# 주문·포지션 테이블을 체결 시점에 갱신합니다. (잔고 폴링 불필요)
+EXECUTION_TR_ID_REAL = "H0STCNI0"
+EXECUTION_TR_ID_MOCK = "H0STCNI9"
+EXECUTION_TR_IDS = (EXECUTION_TR_ID_REAL, EXECUTION_TR_ID_MOCK)
+
+# 체결통보 필드 인덱스 (고객ID^계좌번호^주문번호^원주문번호^매도매수구분^정정구분^주문종류^주문조건^
+#                     종목코드^체결수량^체결단가^체결시간^거부여부^체결여부^접수여부^지점번호^주문수량^...)
+F_ORDER_NO = 2
+F_SIDE = 4          # 01: 매도, 02: 매수
+F_STOCK_CODE = 8
+F_FILL_QTY = 9
+F_FILL_PRICE = 10
+F_FILL_TIME = 11
+F_REJECTED = 12     # 거부여부 (0: 정상, 1: 거부)
+F_FILL_FLAG = 13    # 체결여부 (1: 접수/정정/취소/거부, 2: 체결)
+F_ORDER_QTY = 16
+
+# 체결통보를 기다리는 주문의 대기 한도 (초). 통보가 유실되면 이 시간이 지난 뒤 만료 처리하고
+# 호출 측이 잔고를 다시 조회해 포지션을 맞춥니다. (만료 전까지 해당 종목은 추가 주문하지 않음)
+PENDING_TIMEOUT = 30.0
+
+
+def get_execution_tr_id(is_mock):
+    """모의/실전에 맞는 체결통보 TR ID"""
+    return EXECUTION_TR_ID_MOCK if is_mock else EXECUTION_TR_ID_REAL
+
+
+def build_subscribe_message(approval_key, hts_id, tr_id=EXECUTION_TR_ID_REAL, tr_type="1"):
+    """체결통보 구독 메시지 (tr_key 는 HTS ID)"""
+    return json.dumps({
+        "header": {"approval_key": approval_key, "custtype": "P", "tr_type": tr_type, "content-type": "utf-8"},
+        "body": {"input": {"tr_id": tr_id, "tr_key": hts_id}}
+    })
+
+
+def decrypt_notice(cipher_text, key, iv):
+    """AES256-CBC 로 암호화된 체결통보 복호화"""
+    cipher = AES.new(key.encode("utf-8"), AES.MODE_CBC, iv.encode("utf-8"))
+    return unpad(cipher.decrypt(b64decode(cipher_text)), AES.block_size).decode("utf-8")
+
+
+class ExecutionTracker:
+    """체결통보 기반 주문/포지션 테이블 (웹소켓 스레드와 매매 스레드에서 함께 사용)"""
+
+    def __init__(self):
+        self.orders = {}      # 주문번호 → 주문 상태
+        self.positions = {}   # 종목코드 → 보유수량
+        self.callbacks = []   # on_fill(fill) 목록
+        self.aes_key = None
+        self.aes_iv = None
+        self._lock = threading.Lock()
+
+    # ---------------- 구독/초기화 ----------------
+    def handle_subscribe_response(self, msg_json):
+        """구독 응답(JSON)에서 복호화 key/iv 저장. 체결통보 응답이면 True"""
+        if msg_json.get("header", {}).get("tr_id") not in EXECUTION_TR_IDS:
+            return False
+        output = msg_json.get("body", {}).get("output") or {}
+        if output.get("key") and output.get("iv"):
+            self.aes_key = output["key"]
+            self.aes_iv = output["iv"]
+        return True
+
+    def set_position(self, stock_code, quantity):
+        """잔고 조회 결과 등으로 초기 보유수량 설정"""
+        with self._lock:
+            self.positions[stock_code] = quantity
+
+    def get_position(self, stock_code):
+        with self._lock:
+            return self.positions.get(stock_code, 0)
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    # ---------------- 주문 등록 ----------------
+    def register_order(self, order_no, stock_code, side, quantity, sent_ns=None):
+        """주문 ACK 수신 시 등록 (side: 'buy' / 'sell', sent_ns: 주문 전송 시각 perf_counter_ns)"""
+        with self._lock:
+            order = self.orders.setdefault(order_no, {
+                "order_no": order_no,
+                "stock_code": stock_code,
+                "side": side,
+                "filled_qty": 0,
+                "fills": [],
+                "rejected": False,
+            })
+            order["order_qty"] = quantity
+            order["sent_ns"] = sent_ns
+            order["registered_at"] = time.monotonic()
+            # 체결통보가 ACK 보다 먼저 도착했던 경우 체결 지연을 지금 기록
+            if sent_ns is not None and order["fills"] and "fill_latency_ns" not in order:
+                order["fill_latency_ns"] = order["fills"][0]["recv_ns"] - sent_ns
+                order_latency.record("order_to_fill", order["fill_latency_ns"])
+
+    def has_pending(self, stock_code):
+        """해당 종목에 아직 전량 체결되지 않은 주문이 있는지"""
+        with self._lock:
+            return any(
+                o["stock_code"] == stock_code and self._is_pending(o)
+                for o in self.orders.values()
+            )
+
+    @staticmethod
+    def _is_pending(order):
+        return (not order["rejected"] and not order.get("expired")
+                and order["filled_qty"] < order.get("order_qty", 0))
+
+    def expire_pending(self, timeout=PENDING_TIMEOUT):
+        """timeout 초 넘게 체결통보가 없는 주문을 만료 처리 → 만료된 주문 목록"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                o for o in self.orders.values()
+                if self._is_pending(o) and now - o.get("registered_at", now) > timeout
+            ]
+            for order in expired:
+                order["expired"] = True
+        for order in expired:
+            print(f"⚠️ 체결통보 대기 시간 초과: {order['stock_code']} 주문 {order['order_no']} "
+                  f"({order['filled_qty']}/{order['order_qty']}주 체결 통보) — 대기 해제")
+        return expired
+
+    # ---------------- 통보 처리 ----------------
+    def handle_frame(self, message, recv_ns=None):
+        """'0|' 또는 '1|' 로 시작하는 체결통보 프레임 처리 → 체결 목록 반환"""
+        if recv_ns is None:
+            recv_ns = time.perf_counter_ns()
+        parts = message.split("|", 3)
+        if len(parts) < 4 or parts[1] not in EXECUTION_TR_IDS:
+            return []
+
+        payload = parts[3]
+        if parts[0] == "1":
+            if self.aes_key is None:
+                print("⚠️ 체결통보 복호화 키 없음 (구독 응답 미수신)")
+                return []
+            payload = decrypt_notice(payload, self.aes_key, self.aes_iv)
+
+        fields = payload.split("^")
+        count = max(1, int(parts[2])) if parts[2].isdigit() else 1
+        size = len(fields) // count
+        fills = []
+        for i in range(count):
+            fill = self._apply(fields[i * size:(i + 1) * size], recv_ns)
+            if fill is not None:
+                fills.append(fill)
+        return fills
+
+    def _apply(self, fields, recv_ns):
+        if len(fields) <= F_ORDER_QTY:
+            return None
+        order_no = fields[F_ORDER_NO]
+        stock_code = fields[F_STOCK_CODE]
+        side = "sell" if fields[F_SIDE] == "01" else "buy"
+
+        with self._lock:
+            order = self.orders.setdefault(order_no, {
+                "order_no": order_no,
+                "stock_code": stock_code,
+                "side": side,
+                "filled_qty": 0,
+                "fills": [],
+                "rejected": False,
+            })
+            order.setdefault("order_qty", int(fields[F_ORDER_QTY] or 0))
+            order.setdefault("registered_at", time.monotonic())
+
+            if fields[F_REJECTED] == "1":
+                order["rejected"] = True
+                return None
+            if fields[F_FILL_FLAG] != "2":
+                return None  # 접수/정정/취소 통보
+
+            qty = int(fields[F_FILL_QTY] or 0)
+            fill = {
+                "order_no": order_no,
+                "stock_code": stock_code,
+                "side": side,
+                "quantity": qty,
+                "price": int(fields[F_FILL_PRICE] or 0),
+                "exch_time": int(fields[F_FILL_TIME] or 0),  # 체결시간 HHMMSS
+                "recv_ns": recv_ns,
+            }
+            order["filled_qty"] += qty
+            order["fills"].append(fill)
+            delta = qty if side == "buy" else -qty
+            self.positions[stock_code] = self.positions.get(stock_code, 0) + delta
+
+            if order.get("sent_ns") is not None and "fill_latency_ns" not in order:
+                order["fill_latency_ns"] = recv_ns - order["sent_ns"]
+                order_latency.record("order_to_fill", order["fill_latency_ns"])
+
+        for callback in self.callbacks:
+            callback(fill)
+        return fill
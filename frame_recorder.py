@@ -0,0 +1,148 @@
+import glob
+import json
+import os
+import struct
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# ==============================================================================
+# ========== 웹소켓 원본 프레임 기록 (세션별 append-only 바이너리 파일) ==========
+# ==============================================================================
+# 수신 스레드는 (벽시계 ns, 수신 monotonic ns, 프레임) 을 메모리 큐에 넣기만 하고,
+# 인코딩·파일 쓰기는 백그라운드 스레드가 FLUSH_INTERVAL 마다 모아서 처리합니다.
+# 파일은 날짜가 바뀌면 새로 만듭니다: {source}_{YYYYMMDD}_{세션}.kisfrm
+# 기록은 각 스크립트의 RECORD_DIR 을 지정했을 때만 켜집니다. (기본 꺼짐)
+# 체결통보 구독 응답에 담긴 복호화 key/iv 는 가린 뒤 기록합니다.
+#
+# 파일 형식: MAGIC 다음에 레코드 반복
+#   <q wall_ns> <q recv_ns> <I 길이> <프레임 UTF-8 바이트>   (리틀엔디언)
+DEFAULT_RECORD_DIR = "recordings"  # 기록 파일 기본 위치 (재생 시 검색 위치)
+REDACTED = "***"
+FILE_EXT = ".kisfrm"
+MAGIC = b"KISFRM1\n"
+RECORD_HEADER = struct.Struct("<qqI")
+FLUSH_INTERVAL = 0.5  # 초
+
+
+class FrameRecorder:
+    """원본 프레임 기록기 (record 는 여러 스레드/이벤트 루프에서 호출 가능)"""
+
+    def __init__(self, source, directory=DEFAULT_RECORD_DIR, flush_interval=FLUSH_INTERVAL):
+        self.source = source
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.session = f"{datetime.now():%H%M%S}_{os.getpid()}"
+        self.frames = 0
+        self.bytes = 0
+        self._queue = deque()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._file_date = None
+        self.path = None
+
+    # ---------------- 수신 경로 ----------------
+    def record(self, message, recv_ns=None):
+        """프레임 1개 기록 요청 (큐에 넣고 즉시 반환)"""
+        if recv_ns is None:
+            recv_ns = time.monotonic_ns()
+        if message[:1] in ("{", b"{"):
+            message = redact_secrets(message)
+        self._queue.append((time.time_ns(), recv_ns, message))
+
+    # ---------------- 백그라운드 쓰기 ----------------
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def _open_segment(self, date_str):
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{self.source}_{date_str}_{self.session}{FILE_EXT}")
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._file_date = date_str
+
+    def flush(self):
+        """쌓인 프레임을 파일에 기록 (백그라운드 스레드에서 호출)"""
+        queue = self._queue
+        if not queue:
+            return
+        chunks = []
+        while queue:
+            wall_ns, recv_ns, message = queue.popleft()
+            date_str = time.strftime("%Y%m%d", time.localtime(wall_ns // 1_000_000_000))
+            if date_str != self._file_date:
+                if chunks:
+                    self._file.write(b"".join(chunks))
+                    chunks = []
+                self._open_segment(date_str)
+            payload = message if isinstance(message, bytes) else message.encode("utf-8")
+            chunks.append(RECORD_HEADER.pack(wall_ns, recv_ns, len(payload)))
+            chunks.append(payload)
+            self.frames += 1
+            self.bytes += RECORD_HEADER.size + len(payload)
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+
+    def close(self):
+        """남은 프레임을 모두 기록하고 파일 닫기"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        else:
+            self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def redact_secrets(message):
+    """JSON 응답의 body.output.key / iv (체결통보 복호화 키) 를 가린 프레임 (없으면 원본 그대로)"""
+    if isinstance(message, bytes):
+        message = message.decode("utf-8", "replace")
+    if '"iv"' not in message and '"key"' not in message:
+        return message
+    try:
+        msg_json = json.loads(message)
+    except ValueError:
+        return message
+    output = msg_json.get("body", {}).get("output") if isinstance(msg_json, dict) else None
+    if not isinstance(output, dict):
+        return message
+    for name in ("key", "iv"):
+        if name in output:
+            output[name] = REDACTED
+    return json.dumps(msg_json, ensure_ascii=False)
+
+
+# ---------------- 읽기 ----------------
+def read_frames(path):
+    """기록 파일 → (wall_ns, recv_ns, 프레임 문자열) 순서대로 반환"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"프레임 기록 파일이 아닙니다: {path}")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return  # 끝 (또는 기록 중 잘린 마지막 레코드)
+            wall_ns, recv_ns, length = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield wall_ns, recv_ns, payload.decode("utf-8")
+
+
+def list_segments(directory=DEFAULT_RECORD_DIR, source="*", date="*"):
+    """기록 파일 목록 (파일명 순 = 출처·날짜·세션 순)"""
+    return sorted(glob.glob(os.path.join(directory, f"{source}_{date}_*{FILE_EXT}")))
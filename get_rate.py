@@ -1,7 +1,12 @@
 import websockets
 import json
 import asyncio
-import requests
+import time
+import token_cache
+from rate_limiter import configure_rate_limit
+from realtime_decoder import frame_header, decode_records
+from frame_recorder import FrameRecorder
+from inav import INavEngine
 from typing import Dict
 
 # 한국투자증권 API 설정
@@ -39,41 +44,37 @@ ETF_COMPOSITION = {
     "삼성카드": {"quantity": 154, "code": "029780"}
 }
 
-# 현재가 저장용 딕셔너리
-current_prices: Dict[str, float] = {}
+# ETF_COMPOSITION 수량에 해당하는 ETF 주식 수 (구성 수량이 1CU 기준이면 CU 주식 수) 및 현금
+SHARES_PER_BASKET = 1
+CASH_PER_BASKET = 0
+
+# 종목코드 → 종목명
+STOCK_NAMES: Dict[str, str] = {info["code"]: name for name, info in ETF_COMPOSITION.items()}
+
+# 구성종목 현재가 및 바스켓 가치 (틱마다 차분 갱신, iNAV 는 O(1) 조회)
+inav_engine = INavEngine(
+    {info["code"]: info["quantity"] for info in ETF_COMPOSITION.values()},
+    shares_per_basket=SHARES_PER_BASKET,
+    cash=CASH_PER_BASKET,
+)
+current_prices: Dict[str, float] = inav_engine.prices
+
+# 전체 구성종목 표 출력 간격 (초). iNAV 는 틱마다 출력
+DISPLAY_INTERVAL = 10.0
+
+# 수신 프레임 원본 기록 (예: "recordings". None 이면 기록 안 함)
+RECORD_DIR = None
+frame_recorder = None
 
 
 def get_access_token():
-    """접근 토큰 발급"""
-    url = f"{BASE_URL}/oauth2/tokenP"
-    headers = {"content-type": "application/json"}
-    data = {
-        "grant_type": "client_credentials",
-        "appkey": APP_KEY,
-        "appsecret": APP_SECRET
-    }
-    
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    result = response.json()
-    return result["access_token"]
+    """접근 토큰 (디스크 캐시 우선, 없으면 발급)"""
+    return token_cache.get_access_token(BASE_URL, APP_KEY, APP_SECRET)
 
 
-def get_approval_key(access_token):
-    """웹소켓 접속키 발급"""
-    url = f"{BASE_URL}/oauth2/Approval"
-    headers = {
-        "content-type": "application/json",
-        "authorization": f"Bearer {access_token}"
-    }
-    data = {
-        "grant_type": "client_credentials",
-        "appkey": APP_KEY,
-        "secretkey": APP_SECRET
-    }
-    
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    result = response.json()
-    return result["approval_key"]
+def get_approval_key(access_token=None):
+    """웹소켓 접속키 (디스크 캐시 우선, 없으면 발급)"""
+    return token_cache.get_approval_key(BASE_URL, APP_KEY, APP_SECRET)
 
 
 async def subscribe_stock(websocket, stock_code, tr_key="1"):
@@ -98,28 +99,20 @@ async def subscribe_stock(websocket, stock_code, tr_key="1"):
 
 
 def parse_stock_data(data):
-    """실시간 데이터 파싱"""
+    """실시간 데이터 파싱 → [(종목코드, 현재가), ...] (한 프레임에 묶여 온 모든 체결 레코드)"""
     try:
-        # 데이터 형식: "0|H0STCNT0|stock_code|data..."
-        parts = data.split("|")
-        
-        if len(parts) < 4:
-            return None
-        
-        stock_code = parts[2]
-        data_parts = parts[3].split("^")
-        
-        if len(data_parts) < 3:
-            return None
-        
-        # 현재가는 세 번째 필드
-        current_price = int(data_parts[2])
-        
-        return stock_code, current_price
+        # 데이터 형식: "0|H0STCNT0|건수|레코드1^...^레코드N" (종목코드는 각 레코드의 첫 필드)
+        if data[:2] not in ("0|", "1|"):
+            return []
+        tr_id, count, start = frame_header(data)
+        if tr_id != "H0STCNT0":
+            return []
+        return [(stock_code, current_price)
+                for stock_code, _, current_price, *_ in decode_records(data, tr_id, count, start)]
     
     except Exception as e:
         print(f"데이터 파싱 오류: {e}")
-        return None
+        return []
 
 
 def display_etf_value():
@@ -128,28 +121,29 @@ def display_etf_value():
     print("Kodex 삼성그룹 ETF 구성 종목 실시간 평가")
     print("="*80)
     
-    total_value = 0
-    
     for name, info in ETF_COMPOSITION.items():
         code = info["code"]
         quantity = info["quantity"]
         price = current_prices.get(code, 0)
         value = price * quantity
-        total_value += value
         
         print(f"{name:15s} | 종목코드: {code} | 현재가: {price:>8,}원 | "
               f"수량: {quantity:>5,}주 | 평가금액: {value:>12,}원")
     
     print("="*80)
-    print(f"ETF 1주당 총 평가금액: {total_value:>12,}원")
+    print(f"바스켓 총 평가금액: {inav_engine.basket_value:>12,}원")
+    print(f"ETF 1주당 iNAV     : {inav_engine.inav():>12,.2f}원")
     print("="*80 + "\n")
 
 
 async def receive_data(websocket):
     """실시간 데이터 수신"""
+    last_display = None
     while True:
         try:
             data = await websocket.recv()
+            if frame_recorder is not None:
+                frame_recorder.record(data)
             
             # PINGPONG 처리
             if data == "PINGPONG":
@@ -157,27 +151,24 @@ async def receive_data(websocket):
                 continue
             
             # 데이터 파싱
-            result = parse_stock_data(data)
-            
-            if result:
-                stock_code, current_price = result
-                current_prices[stock_code] = current_price
+            for stock_code, current_price in parse_stock_data(data):
+                # 바스켓 가치를 (새 가격 - 이전 가격) × 수량 만큼 조정
+                if not inav_engine.update(stock_code, current_price):
+                    continue
                 
-                # 종목명 찾기
-                stock_name = None
-                for name, info in ETF_COMPOSITION.items():
-                    if info["code"] == stock_code:
-                        stock_name = name
-                        break
-                
-                if stock_name:
-                    quantity = ETF_COMPOSITION[stock_name]["quantity"]
-                    value = current_price * quantity
-                    print(f"[업데이트] {stock_name}: {current_price:,}원 → 평가금액: {value:,}원")
+                stock_name = STOCK_NAMES[stock_code]
+                value = inav_engine.value(stock_code)
+                if inav_engine.complete:
+                    print(f"[업데이트] {stock_name}: {current_price:,}원 → 평가금액: {value:,}원 | iNAV: {inav_engine.inav():,.2f}원")
                     
-                    # 모든 종목의 가격이 수신되면 전체 평가 표시
-                    if len(current_prices) == len(ETF_COMPOSITION):
+                    # 모든 종목의 가격이 수신되면 전체 평가 표시 (이후 DISPLAY_INTERVAL 마다)
+                    now = time.monotonic()
+                    if last_display is None or now - last_display >= DISPLAY_INTERVAL:
                         display_etf_value()
+                        last_display = now
+                else:
+                    print(f"[업데이트] {stock_name}: {current_price:,}원 → 평가금액: {value:,}원 "
+                          f"(가격 수신 {inav_engine.priced}/{len(ETF_COMPOSITION)})")
         
         except websockets.exceptions.ConnectionClosed:
             print("WebSocket 연결이 종료되었습니다.")
@@ -188,8 +179,9 @@ async def receive_data(websocket):
 
 async def main():
     """메인 함수"""
-    global approval_key
+    global approval_key, frame_recorder
     
+    configure_rate_limit(BASE_URL)
     print("한국투자증권 API 인증 중...")
     access_token = get_access_token()
     print("✓ Access Token 발급 완료")
@@ -199,19 +191,27 @@ async def main():
     
     print(f"\nWebSocket 연결 중: {WS_URL}")
     
-    async with websockets.connect(WS_URL, ping_interval=None) as websocket:
-        print("✓ WebSocket 연결 완료\n")
-        
-        # 모든 종목 구독
-        print("ETF 구성 종목 구독 중...")
-        for name, info in ETF_COMPOSITION.items():
-            await subscribe_stock(websocket, info["code"])
-            await asyncio.sleep(0.1)  # API 호출 제한 방지
-        
-        print("\n실시간 데이터 수신 시작...\n")
-        
-        # 데이터 수신
-        await receive_data(websocket)
+    if RECORD_DIR:
+        frame_recorder = FrameRecorder("get_rate", RECORD_DIR).start()
+    
+    try:
+        async with websockets.connect(WS_URL, ping_interval=None) as websocket:
+            print("✓ WebSocket 연결 완료\n")
+            
+            # 모든 종목 구독
+            print("ETF 구성 종목 구독 중...")
+            for name, info in ETF_COMPOSITION.items():
+                await subscribe_stock(websocket, info["code"])
+                await asyncio.sleep(0.1)  # API 호출 제한 방지
+            
+            print("\n실시간 데이터 수신 시작...\n")
+            
+            # 데이터 수신
+            await receive_data(websocket)
+    finally:
+        if frame_recorder is not None:
+            frame_recorder.close()
+            print(f"💾 수신 프레임 {frame_recorder.frames:,}건 기록: {frame_recorder.path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+# ==============================================================================
+# ========== 증분 iNAV 계산 (구성종목 틱마다 바스켓 가치 차분 갱신) ==========
+# ==============================================================================
+# 구성종목 체결가가 바뀌면 바스켓 가치에 (새 가격 - 이전 가격) × 수량 만 더하므로
+# 틱당 계산은 구성종목 수와 무관하게 O(1) 이고, inav() 는 언제든 최신 값을 바로 돌려줍니다.
+# 가격이 정수(원)면 누적 오차가 없고, 실수 가격이면 REBASE_EVERY 틱마다 전체 합으로 다시 맞춥니다.
+REBASE_EVERY = 100_000
+
+
+class INavEngine:
+    """ETF 구성종목 바스켓의 실시간 가치와 ETF 1주당 iNAV
+
+    quantities: {종목코드: 바스켓 내 수량}
+    shares_per_basket: 바스켓(구성 수량 기준 단위)에 해당하는 ETF 주식 수
+    cash: 바스켓에 포함된 현금
+    """
+
+    def __init__(self, quantities, shares_per_basket=1, cash=0):
+        self.quantities = dict(quantities)
+        self.shares_per_basket = shares_per_basket
+        self.cash = cash
+        self.prices = {code: 0 for code in self.quantities}  # 가격 미수신이면 0
+        self.basket_value = 0   # Σ 가격 × 수량 (가격 수신한 종목만)
+        self.priced = 0         # 가격을 한 번이라도 받은 구성종목 수
+        self.updates = 0
+
+    def update(self, code, price):
+        """구성종목 체결가 반영 (구성종목이 아니면 False)"""
+        quantity = self.quantities.get(code)
+        if quantity is None:
+            return False
+        old = self.prices[code]
+        if not old and price:
+            self.priced += 1
+        elif old and not price:
+            self.priced -= 1  # 가격이 0 으로 돌아가면 미수신으로 다시 셈
+        self.prices[code] = price
+        self.basket_value += (price - old) * quantity
+        self.updates += 1
+        if isinstance(price, float) and self.updates % REBASE_EVERY == 0:
+            self.rebase()
+        return True
+
+    def rebase(self):
+        """전체 구성종목으로 바스켓 가치를 다시 계산 (실수 누적 오차 제거)"""
+        self.basket_value = sum(self.prices[code] * q for code, q in self.quantities.items())
+
+    @property
+    def complete(self):
+        """모든 구성종목 가격 수신 여부"""
+        return self.priced == len(self.quantities)
+
+    def value(self, code):
+        """구성종목 평가금액 (가격 × 수량)"""
+        return self.prices[code] * self.quantities[code]
+
+    def inav(self):
+        """ETF 1주당 iNAV"""
+        return (self.basket_value + self.cash) / self.shares_per_basket
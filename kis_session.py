@@ -0,0 +1,121 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rate_limiter import get_rate_limiter
+
+# ==============================================================================
+# ========== 공유 HTTP 세션 풀 (Keep-Alive) ==========
+# ==============================================================================
+# 모든 REST 호출이 하나의 세션을 공유하여 TCP+TLS 핸드셰이크를 재사용합니다.
+POOL_CONNECTIONS = 4        # 호스트별 커넥션 풀 개수 (모의/실전/기타)
+POOL_MAXSIZE = 8            # 호스트당 최대 keep-alive 연결 수
+POOL_BLOCK = True           # 풀이 가득 차면 새 연결 대신 반납 대기
+CONNECT_RETRIES = 2         # 연결 단계 실패만 재시도 (주문 중복 방지를 위해 읽기 재시도 없음)
+HEALTH_CHECK_INTERVAL = 30  # 헬스체크 주기 (초) - 서버 idle timeout 보다 짧게
+
+_session = None
+_session_lock = threading.Lock()
+_health_thread = None
+_health_stop = threading.Event()
+
+
+class RateLimitedSession(requests.Session):
+    """모든 요청이 전역 토큰 버킷을 거쳐 나가는 세션"""
+
+    def request(self, method, url, *args, **kwargs):
+        get_rate_limiter().acquire()
+        return super().request(method, url, *args, **kwargs)
+
+
+def _create_session():
+    """커넥션 풀이 설정된 새 세션 생성"""
+    session = RateLimitedSession()
+    retry = Retry(
+        total=CONNECT_RETRIES,
+        connect=CONNECT_RETRIES,
+        read=0,
+        redirect=0,
+        status=0,
+        backoff_factor=0.05,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=POOL_BLOCK,
+        max_retries=retry,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """공유 세션 반환 (없으면 생성, 스레드 안전)"""
+    global _session
+    session = _session
+    if session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+            session = _session
+    return session
+
+
+def reset_session():
+    """세션을 폐기하고 다음 호출 시 새로 생성하도록 함
+
+    다른 스레드가 이전 세션으로 요청 중일 수 있으므로 닫지 않고 참조만 끊습니다.
+    (진행 중인 요청이 끝나 더 이상 참조가 없으면 가비지 컬렉션 시 연결이 정리됨)
+    """
+    global _session
+    with _session_lock:
+        _session = None
+
+
+def close_session():
+    """헬스체크 중지 및 세션 종료 (프로그램 종료 시 호출)"""
+    global _session
+    stop_health_check()
+    with _session_lock:
+        old, _session = _session, None
+    if old is not None:
+        old.close()
+
+
+def warm_up(base_url, timeout=3):
+    """base_url 로 미리 연결을 열어 첫 주문의 핸드셰이크 비용을 제거"""
+    try:
+        get_session().head(base_url, timeout=timeout)
+        return True
+    except requests.RequestException as e:
+        print(f"⚠️ 세션 워밍업 실패: {e}")
+        return False
+
+
+def _health_loop(base_url, interval):
+    while not _health_stop.wait(interval):
+        if not warm_up(base_url):
+            # 끊어진 연결이 풀에 남지 않도록 세션을 새로 만든 뒤 다시 연결
+            reset_session()
+            warm_up(base_url)
+
+
+def start_health_check(base_url, interval=HEALTH_CHECK_INTERVAL):
+    """주기적으로 연결 상태를 확인하고 keep-alive 를 유지하는 데몬 스레드 시작"""
+    global _health_thread
+    if _health_thread is not None and _health_thread.is_alive():
+        return
+    _health_stop.clear()
+    warm_up(base_url)
+    _health_thread = threading.Thread(target=_health_loop, args=(base_url, interval), daemon=True)
+    _health_thread.start()
+
+
+def stop_health_check():
+    """헬스체크 스레드 중지"""
+    global _health_thread
+    _health_stop.set()
+    if _health_thread is not None:
+        _health_thread.join(timeout=1)
+        _health_thread = None
@@ -0,0 +1,254 @@
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# ==============================================================================
+# ========== 로컬 KIS REST 스텁 서버 (부하·지연 테스트용) ==========
+# ==============================================================================
+# 이 저장소가 사용하는 엔드포인트만 흉내 냅니다.
+# trading_function / live_trading 의 BASE_URL, config.yaml 의 URL_BASE 를
+# http://127.0.0.1:<port> 로 바꾸면 실제 서버 없이 주문 처리량과 지연을 측정할 수 있습니다.
+DEFAULT_PORT = 18443
+DEFAULT_PRICE = 15000
+
+RATE_LIMIT_RESPONSE = {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+SERVER_ERROR_RESPONSE = {"rt_cd": "1", "msg_cd": "EGW00500", "msg1": "스텁 서버 임의 오류"}
+
+
+class StubConfig:
+    """스텁 서버 동작 설정 (실행 중에도 값 변경 가능)"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit=0, price=DEFAULT_PRICE):
+        self.latency_ms = latency_ms    # 응답 전 기본 지연
+        self.jitter_ms = jitter_ms      # 0 ~ jitter_ms 균등분포 추가 지연
+        self.error_rate = error_rate    # 0~1, HTTP 500 응답 비율
+        self.rate_limit = rate_limit    # 초당 허용 요청 수 (0: 제한 없음), 초과 시 EGW00201
+        self.price = price              # inquire-price / 체결가로 쓰는 가격
+
+
+class StubState:
+    """주문번호·보유수량·요청 통계 (핸들러 스레드 간 공유)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.order_seq = itertools.count(1)
+        self.holdings = {}
+        self.counts = {}
+        self.window_start = 0
+        self.window_count = 0
+
+    def hit(self, path):
+        with self.lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+
+    def over_rate_limit(self, rate_limit):
+        """1초 고정 윈도우 기준 유량 초과 여부"""
+        if not rate_limit:
+            return False
+        now = int(time.monotonic())
+        with self.lock:
+            if now != self.window_start:
+                self.window_start = now
+                self.window_count = 0
+            self.window_count += 1
+            return self.window_count > rate_limit
+
+
+def _hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+class KISStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 delayed ACK 로 인한 40ms 지연 방지
+
+    # ---------------- 공통 ----------------
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json; charset=utf-8")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("content-length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _simulate(self, path):
+        """지연·오류·유량 초과를 흉내 내고, 정상 처리할 경우 True"""
+        cfg, state = self.server.config, self.server.state
+        state.hit(path)
+        delay = cfg.latency_ms + (random.uniform(0, cfg.jitter_ms) if cfg.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if state.over_rate_limit(cfg.rate_limit):
+            self._send(500, RATE_LIMIT_RESPONSE)
+            return False
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            self._send(500, SERVER_ERROR_RESPONSE)
+            return False
+        return True
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("content-length", "0")
+        self.end_headers()
+
+    # ---------------- POST ----------------
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._read_body()
+        handler = {
+            "/oauth2/tokenP": self._token,
+            "/oauth2/Approval": self._approval,
+            "/uapi/hashkey": self._hashkey,
+            "/uapi/domestic-stock/v1/trading/order-cash": self._order_cash,
+        }.get(path)
+        if handler is None:
+            self._send(404, {"rt_cd": "1", "msg1": f"unknown path {path}"})
+            return
+        if self._simulate(path):
+            handler(body)
+
+    def _token(self, body):
+        expires = datetime.now() + timedelta(seconds=86400)
+        self._send(200, {
+            "access_token": "stub-" + _hash(body)[:32],
+            "token_type": "Bearer",
+            "expires_in": 86400,
+            "access_token_token_expired": expires.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+    def _approval(self, body):
+        self._send(200, {"approval_key": "stub-approval-" + _hash(body)[:16]})
+
+    def _hashkey(self, body):
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            data = {}
+        self._send(200, {"BODY": data, "HASH": _hash(body)})
+
+    def _order_cash(self, body):
+        hashkey = self.headers.get("hashkey")
+        if hashkey and hashkey != _hash(body):
+            self._send(200, {"rt_cd": "1", "msg_cd": "EGW00205", "msg1": "hashkey 가 본문과 일치하지 않습니다."})
+            return
+        data = json.loads(body)
+        qty = int(data.get("ORD_QTY", 0))
+        tr_id = self.headers.get("tr_id", "")
+        sign = -1 if tr_id.endswith("0801U") else 1  # 0801U: 매도, 0802U: 매수
+        state = self.server.state
+        with state.lock:
+            order_no = f"{next(state.order_seq):010d}"
+            code = data.get("PDNO", "")
+            state.holdings[code] = state.holdings.get(code, 0) + sign * qty
+        self._send(200, {
+            "rt_cd": "0",
+            "msg_cd": "APBK0013",
+            "msg1": "주문 전송 완료 되었습니다.",
+            "output": {"KRX_FWDG_ORD_ORGNO": "00950", "ODNO": order_no, "ORD_TMD": datetime.now().strftime("%H%M%S")},
+        })
+
+    # ---------------- GET ----------------
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {k.upper(): v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+        handler = {
+            "/uapi/domestic-stock/v1/quotations/inquire-price": self._inquire_price,
+            "/uapi/domestic-stock/v1/quotations/inquire-daily-price": self._inquire_daily_price,
+            "/uapi/domestic-stock/v1/trading/inquire-balance": self._inquire_balance,
+            "/uapi/domestic-stock/v1/trading/inquire-psbl-order": self._inquire_psbl_order,
+        }.get(parsed.path)
+        if handler is None:
+            self._send(404, {"rt_cd": "1", "msg1": f"unknown path {parsed.path}"})
+            return
+        if self._simulate(parsed.path):
+            handler(params)
+
+    def _inquire_price(self, params):
+        price = self.server.config.price
+        self._send(200, {"rt_cd": "0", "msg1": "정상처리 되었습니다.", "output": {
+            "stck_prpr": str(price), "stck_oprc": str(price), "stck_hgpr": str(price), "stck_lwpr": str(price),
+        }})
+
+    def _inquire_daily_price(self, params):
+        price = self.server.config.price
+        rows = []
+        for i in range(30):
+            day = (datetime.now() - timedelta(days=i)).strftime("%Y%m%d")
+            rows.append({"stck_bsop_date": day, "stck_oprc": str(price), "stck_hgpr": str(price + 100),
+                         "stck_lwpr": str(price - 100), "stck_clpr": str(price)})
+        self._send(200, {"rt_cd": "0", "msg1": "정상처리 되었습니다.", "output": rows})
+
+    def _inquire_balance(self, params):
+        price = self.server.config.price
+        state = self.server.state
+        with state.lock:
+            holdings = {code: qty for code, qty in state.holdings.items() if qty > 0}
+        output1 = [{
+            "pdno": code, "prdt_name": code, "hldg_qty": str(qty), "pchs_avg_pric": str(price),
+            "evlu_amt": str(price * qty), "evlu_pfls_amt": "0", "evlu_pfls_rt": "0.00",
+        } for code, qty in holdings.items()]
+        total = sum(price * qty for qty in holdings.values())
+        self._send(200, {"rt_cd": "0", "msg1": "조회가 완료되었습니다.", "output1": output1, "output2": [{
+            "scts_evlu_amt": str(total), "evlu_pfls_smtl_amt": "0", "tot_evlu_amt": str(total),
+        }]})
+
+    def _inquire_psbl_order(self, params):
+        self._send(200, {"rt_cd": "0", "msg1": "조회가 완료되었습니다.", "output": {
+            "ord_psbl_cash": "100000000", "nrcvb_buy_amt": "100000000", "max_buy_qty": "10000",
+        }})
+
+
+class KISStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config=None):
+        super().__init__(address, KISStubHandler)
+        self.config = config or StubConfig()
+        self.state = StubState()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(port=0, config=None, host="127.0.0.1"):
+    """백그라운드 스레드에서 스텁 서버 시작 (port=0 이면 빈 포트 자동 할당) → 서버 객체"""
+    server = KISStubServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 KIS REST 스텁 서버")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="초당 허용 요청 수 (0: 무제한)")
+    parser.add_argument("--price", type=int, default=DEFAULT_PRICE)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.price)
+    server = KISStubServer(("127.0.0.1", args.port), config)
+    print(f"🧪 KIS 스텁 서버 실행 중: {server.base_url} (Ctrl+C 로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n스텁 서버를 종료합니다.")
+        print(f"요청 통계: {server.state.counts}")
@@ -0,0 +1,122 @@
+import json
+import math
+import threading
+import time
+
+# ==============================================================================
+# ========== 주문 경로 구간별 지연 측정 (in-memory 히스토그램) ==========
+# ==============================================================================
+# 값은 time.perf_counter_ns() 기준 나노초로 기록하고,
+# 옥타브(2배)당 SUB_BUCKETS 개의 로그 버킷에 누적합니다. (상대 오차 약 9%)
+SUB_BUCKETS = 8
+
+
+class LatencyHistogram:
+    """로그 버킷 지연 히스토그램 (나노초)"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    @staticmethod
+    def _bucket_index(ns):
+        return int(math.log2(ns) * SUB_BUCKETS) if ns > 1 else 0
+
+    @staticmethod
+    def _bucket_upper(idx):
+        return 2 ** ((idx + 1) / SUB_BUCKETS)
+
+    def record(self, ns):
+        idx = self._bucket_index(ns)
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, pct):
+        """백분위 지연 (나노초, 해당 버킷 상한값 - 최대값으로 잘라냄)"""
+        if self.count == 0:
+            return 0
+        target = math.ceil(self.count * pct / 100)
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= target:
+                return min(self.max_ns, int(self._bucket_upper(idx)))
+        return self.max_ns
+
+    def mean(self):
+        return self.total_ns / self.count if self.count else 0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "min_ns": self.min_ns or 0,
+            "max_ns": self.max_ns,
+            "mean_ns": self.mean(),
+            "p50_ns": self.percentile(50),
+            "p99_ns": self.percentile(99),
+            "buckets": {str(idx): n for idx, n in sorted(self.buckets.items())},
+        }
+
+
+class LatencyRecorder:
+    """구간(stage) 이름별 히스토그램 모음 (스레드 안전)"""
+
+    def __init__(self):
+        self._hists = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, ns):
+        with self._lock:
+            hist = self._hists.get(stage)
+            if hist is None:
+                hist = self._hists[stage] = LatencyHistogram()
+            hist.record(ns)
+
+    def record_since(self, stage, start_ns):
+        """start_ns(perf_counter_ns) 이후 경과 시간을 기록하고 현재 시각 반환"""
+        now = time.perf_counter_ns()
+        self.record(stage, now - start_ns)
+        return now
+
+    def snapshot(self):
+        with self._lock:
+            return {stage: hist.to_dict() for stage, hist in self._hists.items()}
+
+    def reset(self):
+        with self._lock:
+            self._hists.clear()
+
+    def summary_lines(self):
+        """구간별 p50/p99 요약 문자열 목록 (ms)"""
+        lines = [f"{'구간':16s} | {'건수':>6s} | {'p50(ms)':>9s} | {'p99(ms)':>9s} | {'최대(ms)':>9s}"]
+        for stage, stat in self.snapshot().items():
+            lines.append(
+                f"{stage:16s} | {stat['count']:>6d} | {stat['p50_ns'] / 1e6:>9.3f} | "
+                f"{stat['p99_ns'] / 1e6:>9.3f} | {stat['max_ns'] / 1e6:>9.3f}"
+            )
+        return lines
+
+    def print_summary(self):
+        print("\n" + "=" * 64)
+        print("⏱️ 주문 경로 구간별 지연")
+        print("=" * 64)
+        for line in self.summary_lines():
+            print(line)
+        print("=" * 64)
+
+    def dump(self, path):
+        """히스토그램을 JSON 파일로 저장"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+
+# 주문 경로 전역 측정기
+order_latency = LatencyRecorder()
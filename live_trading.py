@@ -1,10 +1,21 @@
 import websocket
-import requests
 import json
+import random
+import signal
 import time
 import threading
 from datetime import datetime
-from trading_function import buy_etf, sell_etf, get_hashkey
+from trading_function import buy_etf, sell_etf, get_hashkey, prefetch_hashkey
+from kis_session import get_session, start_health_check, close_session
+from rate_limiter import configure_rate_limit
+from latency import LatencyRecorder, order_latency
+import token_cache
+from execution_notice import ExecutionTracker, EXECUTION_TR_IDS, build_subscribe_message, get_execution_tr_id
+from realtime_decoder import frame_header, decode_records, format_hhmmss
+from tick_buffer import TickStore
+from frame_recorder import FrameRecorder
+from etf_state import EtfStateTable
+from conflating_queue import ConflatingQueue
 # ==============================================================================
 # ========== 통합 설정 (Configuration) ==========
 # ==============================================================================
@@ -22,97 +33,105 @@ APPROVAL_KEY = "a34f9329-c5ef-47b6-8030-30b9adb7f40c"  # 👈 본인의 웹소
 BASE_URL = "https://openapivts.koreainvestment.com:29443"  # 모의투자 서버
 WS_URL = "ws://ops.koreainvestment.com:21000"  # 모의투자 웹소켓 서버
 # 실전투자 시 URL을 변경해야 합니다.
+IS_MOCK = "openapivts" in BASE_URL
 
-# --- 매매 대상 종목 정보 ---
-STOCK_CODE = "102780"  # KODEX 삼성그룹
-STOCK_NAME = "KODEX 삼성그룹"
+# --- 실시간 체결통보 (H0STCNI0 / 모의 H0STCNI9) ---
+# HTS ID 를 입력하면 주문 ACK 대신 실제 체결통보를 받았을 때 포지션을 변경합니다.
+HTS_ID = ""  # 👈 본인의 HTS ID 입력 (비워두면 주문 ACK 기준으로 포지션 변경)
+
+# --- 매매 판단 주기 ---
+# 시세가 갱신될 때마다 즉시 판단합니다. COALESCE_WINDOW_MS > 0 이면 첫 갱신 후 그 시간 동안
+# 함께 도착한 NAV/현재가 갱신을 모아 최신 값으로 한 번만 판단합니다.
+# 웹소켓 스레드는 종목·시세 종류별 최신 값만 MARKET_QUEUE_SIZE 크기 전달 큐에 넣고 바로 반환합니다.
+COALESCE_WINDOW_MS = 0
+MARKET_QUEUE_SIZE = 4096
+STATUS_INTERVAL = 1.0  # 상태 출력 간격 (초). 시세가 없으면 이 간격으로만 깨어남
+MAX_QUOTE_AGE_MS = 0   # NAV/현재가 수신 후 이 시간(ms)이 지나면 매매 판단 보류 (0: 사용 안 함)
+# 종목별 주문 시도(성공·거부·오류 모두) 후 이 시간(초) 동안 같은 종목 재주문 보류
+# (거부된 주문이 틱마다 재전송되지 않도록 함)
+ORDER_RETRY_COOLDOWN = 1.0
+
+# --- 웹소켓 재연결 ---
+# 연결이 끊기면 전 종목을 STALE 로 표시하고(끊긴 뒤 NAV·현재가가 모두 새로 들어올 때까지 매매 보류),
+# 0.5~1배 × min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY × 2^시도횟수) 초 대기 후 재연결·재구독합니다.
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+PING_INTERVAL = 20  # 웹소켓 ping 간격 (초). 응답 없는 연결을 PING_TIMEOUT 안에 끊김으로 감지
+PING_TIMEOUT = 10
+
+# --- 수신 프레임 원본 기록 (백테스트/벤치마크용, 예: "recordings". None 이면 기록 안 함) ---
+RECORD_DIR = None
+
+# --- 주문 지연 측정 결과 저장 경로 (종료 시 기록) ---
+LATENCY_DUMP_PATH = f"order_latency_{datetime.now():%Y%m%d}.json"
+
+# --- 매매 대상 ETF 목록 ---
+# 모든 종목을 하나의 웹소켓 연결로 구독하며, 종목마다 기준값/수량/포지션을 따로 관리합니다.
+#   매수: NAV - 현재가 >= buy_spread (미보유 시)
+#   매도: NAV - 현재가 <  sell_spread (보유 시)
+ETF_TABLE = [
+    {"code": "102780", "name": "KODEX 삼성그룹", "buy_spread": 15, "sell_spread": 0, "quantity": 1},
+]
+SUBSCRIBE_INTERVAL = 0.1  # 구독 요청 간격 (초)
 
 # ==============================================================================
 # ========== 전역 변수 (Global Variables) ==========
 # ==============================================================================
-# 실시간 시세 데이터를 저장할 딕셔너리
-realtime_data = {
-    "nav": None,
-    "current_price": None,
-    "nav_time": None,
-    "price_time": None
-}
-
-# 현재 포지션 상태 ("none": 미보유, "holding": 보유)
-# 스크립트 시작 시 보유 잔고를 조회하여 초기화됩니다.
-position = "none"
+# 종목 번호(ETF_TABLE 순서)로 접근하는 NAV/현재가/기준값/포지션 배열
+# nav_recv_ns/price_recv_ns 는 수신 시각(time.monotonic_ns), price_exch_time 은 거래소 체결시간(HHMMSS 정수)
+# 포지션(holding)은 스크립트 시작 시 보유 잔고를 조회하여 초기화됩니다.
+etf_state = EtfStateTable(ETF_TABLE)
+
+# 종목별 시세 이력 (고정 크기 링버퍼, 전략에서 window() 로 최근 구간 조회)
+tick_history = TickStore()   # 체결가 (recv_ns, exch_time, price, volume, bid, ask)
+nav_history = TickStore()    # NAV (price 필드에 NAV 기록)
 
 # API 접근 토큰
 ACCESS_TOKEN = None
 
+# 체결통보 기반 주문/보유수량 테이블
+execution_tracker = ExecutionTracker()
+
+# 수신 프레임 기록기 (메인에서 시작)
+frame_recorder = None
+
+# 시세/체결 갱신 전달 큐 (웹소켓 스레드 → 매매 스레드)
+# 키: (FEED_*, 종목 번호), 값: (수신 monotonic_ns, ...) — 매매 스레드가 꺼내 etf_state 에 반영
+FEED_NAV = 0    # (recv_ns, nav)
+FEED_PRICE = 1  # (recv_ns, exch_time, price)
+FEED_FILL = 2   # (recv_ns,)
+FEED_STALE = 3  # (disconnect_ns,) — 연결 끊김 (종목 번호 STALE_ALL). etf_state 쓰기는 매매 스레드에서만
+STALE_ALL = -1
+market_queue = ConflatingQueue(MARKET_QUEUE_SIZE)
+
+# 웹소켓 연결 감시
+shutdown = threading.Event()      # Ctrl+C 등 종료 요청 (재연결 중단)
+disconnect_ns = None              # 연결이 끊긴 시각 (재연결 후 첫 시세 수신 시 None)
+reconnect_attempt = 0             # 연속 재연결 시도 횟수 (시세 수신이 재개되면 0)
+connection_gaps = LatencyRecorder()  # ws_gap: 끊김→첫 시세, symbol_recovery: 끊김→종목 매매 재개
+
 # ==============================================================================
 # ========== 1. 한국투자증권 REST API (매매 및 조회) ==========
 # ==============================================================================
 def get_access_token():
-    """OAuth 인증을 통해 접근 토큰을 발급받습니다."""
+    """접근 토큰을 디스크 캐시에서 가져오거나 새로 발급받습니다."""
     global ACCESS_TOKEN
-    url = f"{BASE_URL}/oauth2/tokenP"
-    headers = {"content-type": "application/json"}
-    data = {
-        "grant_type": "client_credentials",
-        "appkey": APP_KEY,
-        "appsecret": APP_SECRET
-    }
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    if response.status_code == 200:
-        ACCESS_TOKEN = response.json()["access_token"]
-        print("✅ 접근 토큰 발급 성공")
+    token = token_cache.get_access_token(BASE_URL, APP_KEY, APP_SECRET)
+    if token:
+        ACCESS_TOKEN = token
+        print("✅ 접근 토큰 준비 완료")
         return True
     else:
-        print(f"❌ 접근 토큰 발급 실패: {response.text}")
         return False
 
-def run_trading_logic():
-    """1초마다 NAV와 현재가를 비교하여 매매 조건을 확인하고 실행하는 함수"""
-    global position
-    
-    while True:
-        time.sleep(1) # 1초 대기
-        
-        nav = realtime_data.get("nav")
-        price = realtime_data.get("current_price")
-        
-        # 현재 상태 출력
-        now_str = datetime.now().strftime('%H:%M:%S')
-        print(f"\n[{now_str}] 현재 포지션: {position.upper()}")
-        print(f"  - NAV      : {nav if nav is not None else '수신 대기 중...'}")
-        print(f"  - 현재가   : {price if price is not None else '수신 대기 중...'}")
-        
-        # NAV와 현재가 데이터가 모두 수신된 경우에만 로직 실행
-        if nav is not None and price is not None:
-            diff = nav - price
-            print(f"  - 괴리율   : {diff:+.2f} 원")
-
-            # --- 매수 조건 ---
-            if diff >= 15 and position == "none":
-                print("  >> 매수 신호 발생 (NAV - 현재가 >= 15)")
-                # 변경: trading__funtrading_function.buy_etf 사용 (인자 전달)
-                result = buy_etf(
-                    ACCESS_TOKEN, BASE_URL, APP_KEY, APP_SECRET, ACCOUNT_NO,
-                    STOCK_CODE, 1, STOCK_NAME
-                )
-                if result and result.get("rt_cd") == "0":
-                    position = "holding"
-
-            # --- 매도 조건 ---
-            elif diff < 0 and position == "holding":
-                print("  >> 매도 신호 발생 (NAV - 현재가 < 0)")
-                result = sell_etf(
-                    ACCESS_TOKEN, BASE_URL, APP_KEY, APP_SECRET, ACCOUNT_NO,
-                    STOCK_CODE, 1, STOCK_NAME
-                )
-                if result and result.get("rt_cd") == "0":
-                    position = "none"
-
-def get_initial_balance(stock_code):
-    """스크립트 시작 시 보유 잔고를 확인하여 포지션 상태를 설정합니다."""
-    global position
-    print("--- 초기 보유 잔고 확인 중... ---")
+def on_token_refresh(token):
+    """백그라운드 재발급된 토큰으로 교체"""
+    global ACCESS_TOKEN
+    ACCESS_TOKEN = token
+    print("🔄 접근 토큰 갱신 완료")
+
+def fetch_holdings():
+    """잔고 조회 → {종목코드: 보유수량} (실패 시 None)"""
     path = "/uapi/domestic-stock/v1/trading/inquire-balance"
     url = f"{BASE_URL}{path}"
     
@@ -138,28 +157,49 @@ def get_initial_balance(stock_code):
         "CTX_AREA_FK100": "",
         "CTX_AREA_NK100": ""
     }
-    response = requests.get(url, headers=headers, params=params)
+    response = get_session().get(url, headers=headers, params=params)
     
     if response.status_code == 200:
         data = response.json()
         if data["rt_cd"] == "0":
-            stocks = data["output1"]
-            found = False
-            for stock in stocks:
-                if stock["pdno"] == stock_code:
-                    quantity = int(stock["hldg_qty"])
-                    if quantity > 0:
-                        position = "holding"
-                        print(f"✅ 초기 잔고 확인: {STOCK_NAME} {quantity}주 보유 중. (포지션: holding)")
-                    found = True
-                    break
-            if not found:
-                position = "none"
-                print(f"✅ 초기 잔고 확인: {STOCK_NAME} 미보유. (포지션: none)")
-        else:
-            print(f"❌ 잔고 조회 실패: {data['msg1']}")
+            return {stock["pdno"]: int(stock["hldg_qty"]) for stock in data["output1"]}
+        print(f"❌ 잔고 조회 실패: {data['msg1']}")
     else:
         print(f"❌ 잔고 조회 API 호출 실패: {response.text}")
+    return None
+
+def get_initial_balance():
+    """스크립트 시작 시 보유 잔고를 확인하여 ETF_TABLE 전 종목의 포지션 상태를 설정합니다."""
+    print("--- 초기 보유 잔고 확인 중... ---")
+    held = fetch_holdings()
+    if held is None:
+        return
+    for i, stock_code in enumerate(etf_state.codes):
+        quantity = held.get(stock_code, 0)
+        execution_tracker.set_position(stock_code, quantity)
+        etf_state.holding[i] = quantity > 0
+        name = etf_state.names[i]
+        if quantity > 0:
+            print(f"✅ 초기 잔고 확인: {name} {quantity}주 보유 중. (포지션: holding)")
+        else:
+            print(f"✅ 초기 잔고 확인: {name} 미보유. (포지션: none)")
+
+def resync_expired_orders():
+    """체결통보가 끝내 오지 않은 주문을 만료 처리하고, 해당 종목 포지션을 잔고 조회로 다시 맞춤"""
+    expired = execution_tracker.expire_pending()
+    if not expired:
+        return
+    held = fetch_holdings()
+    if held is None:
+        return  # 조회 실패: 체결통보 기준 포지션 유지
+    for stock_code in {order["stock_code"] for order in expired}:
+        i = etf_state.index.get(stock_code)
+        if i is None:
+            continue
+        quantity = held.get(stock_code, 0)
+        execution_tracker.set_position(stock_code, quantity)
+        etf_state.holding[i] = quantity > 0
+        print(f"🔄 잔고 재조회: {etf_state.names[i]} {quantity}주 (포지션: {position_label(i)})")
 
 
 # ==============================================================================
@@ -167,33 +207,45 @@ def get_initial_balance(stock_code):
 # ==============================================================================
 def on_message(ws, message):
     """웹소켓 메시지 수신 시 호출되는 함수"""
-    global realtime_data
+    recv_ns = time.monotonic_ns()
+    if frame_recorder is not None:
+        frame_recorder.record(message, recv_ns)
     try:
         if message == "PINGPONG":
             ws.pong(message)
             return
 
         if message.startswith('0|') or message.startswith('1|'):
-            parts = message.split('|')
-            tr_id = parts[1]
-            data_str = parts[3]
+            if disconnect_ns is not None:
+                on_feed_resumed(recv_ns)
+            tr_id, count, start = frame_header(message)
+
+            if tr_id in EXECUTION_TR_IDS:  # 실시간 체결통보 (암호화)
+                execution_tracker.handle_frame(message)
 
-            if tr_id == "H0STNAV0":  # 실시간 ETF NAV
-                fields = data_str.split('^')
-                if len(fields) > 1:
-                    realtime_data["nav"] = float(fields[1])
-                    realtime_data["nav_time"] = datetime.now().strftime("%H:%M:%S")
+            elif tr_id == "H0STNAV0":  # 실시간 ETF NAV
+                # 한 프레임에 여러 건(여러 종목)이 묶여 올 수 있으므로 순서대로 모두 반영
+                for code, nav in decode_records(message, tr_id, count, start):
+                    i = etf_state.index.get(code)
+                    if i is None:
+                        continue
+                    nav_history.append_tick(code, recv_ns, price=nav)
+                    market_queue.put((FEED_NAV, i), (recv_ns, nav))
 
             elif tr_id == "H0STCNT0":  # 실시간 주식 체결가
-                fields = data_str.split('^')
-                if len(fields) > 2:
-                    realtime_data["current_price"] = int(fields[2])
-                    realtime_data["price_time"] = datetime.now().strftime("%H:%M:%S")
+                for code, exch_time, price, volume, bid, ask in decode_records(message, tr_id, count, start):
+                    i = etf_state.index.get(code)
+                    if i is None:
+                        continue
+                    tick_history.append_tick(code, recv_ns, exch_time, price, volume, bid, ask)
+                    market_queue.put((FEED_PRICE, i), (recv_ns, exch_time, price))
 
         elif message.startswith('{'):
             msg_json = json.loads(message)
+            # 체결통보 구독 응답이면 복호화 key/iv 저장
+            execution_tracker.handle_subscribe_response(msg_json)
             if msg_json.get('header', {}).get('tr_id'):
-                print(f"[응답] {msg_json['header']['tr_id']} - {msg_json['msg1']}")
+                print(f"[응답] {msg_json['header']['tr_id']} - {msg_json.get('body', {}).get('msg1')}")
 
     except Exception as e:
         print(f"메시지 처리 오류: {e} | 원본 메시지: {message}")
@@ -202,93 +254,292 @@ def on_error(ws, error):
     print(f"[오류] {error}")
 
 def on_close(ws, close_status_code, close_msg):
-    print("[웹소켓 연결 종료]")
+    print(f"[웹소켓 연결 종료] {close_status_code or ''} {close_msg or ''}")
+
+def mark_disconnected():
+    """연결 끊김 기록: 매매 스레드에 전 종목 STALE 표시 요청 (재연결 전 다시 끊겨도 처음 끊긴 시각 유지)"""
+    global disconnect_ns
+    if disconnect_ns is None:
+        disconnect_ns = time.monotonic_ns()
+    market_queue.put((FEED_STALE, STALE_ALL), (disconnect_ns,))
+
+def on_feed_resumed(recv_ns):
+    """재연결 후 첫 시세 프레임: 끊김 구간 길이 기록, 백오프 초기화"""
+    global disconnect_ns, reconnect_attempt
+    gap_ns = recv_ns - disconnect_ns
+    disconnect_ns = None
+    reconnect_attempt = 0
+    connection_gaps.record("ws_gap", gap_ns)
+    print(f"✅ 실시간 시세 재개 (끊김 {gap_ns / 1e9:,.2f}초). 종목별로 NAV·현재가가 새로 들어오면 매매를 재개합니다.")
+
+def build_quote_subscribe(tr_id, stock_code, tr_type="1"):
+    """실시간 시세 구독(tr_type=1)/해제(2) 요청 메시지"""
+    return json.dumps({
+        "header": {"approval_key": APPROVAL_KEY, "custtype": "P", "tr_type": tr_type, "content-type": "utf-8"},
+        "body": {"input": {"tr_id": tr_id, "tr_key": stock_code}}
+    })
 
 def on_open(ws):
-    """웹소켓 연결 성공 시, 실시간 데이터 구독 요청"""
-    print("[웹소켓 연결 성공] 실시간 시세 구독을 요청합니다.")
-    # NAV 구독 요청
-    nav_subscribe = {
-        "header": {"approval_key": APPROVAL_KEY, "custtype": "P", "tr_type": "1", "content-type": "utf-8"},
-        "body": {"input": {"tr_id": "H0STNAV0", "tr_key": STOCK_CODE}}
-    }
-    # 현재가 구독 요청
-    price_subscribe = {
-        "header": {"approval_key": APPROVAL_KEY, "custtype": "P", "tr_type": "1", "content-type": "utf-8"},
-        "body": {"input": {"tr_id": "H0STCNT0", "tr_key": STOCK_CODE}}
-    }
-    ws.send(json.dumps(nav_subscribe))
-    time.sleep(0.5)
-    ws.send(json.dumps(price_subscribe))
+    """웹소켓 연결 성공 시, ETF_TABLE 전 종목의 실시간 데이터 구독 요청"""
+    print(f"[웹소켓 연결 성공] {len(etf_state)}개 종목의 실시간 시세 구독을 요청합니다.")
+    for stock_code in etf_state.codes:
+        ws.send(build_quote_subscribe("H0STNAV0", stock_code))  # NAV
+        time.sleep(SUBSCRIBE_INTERVAL)
+        ws.send(build_quote_subscribe("H0STCNT0", stock_code))  # 현재가
+        time.sleep(SUBSCRIBE_INTERVAL)
+    # 체결통보 구독 요청
+    if HTS_ID:
+        ws.send(build_subscribe_message(APPROVAL_KEY, HTS_ID, get_execution_tr_id(IS_MOCK)))
+
+def position_label(i):
+    return "holding" if etf_state.holding[i] else "none"
+
+def on_fill(fill):
+    """체결통보 수신 시 매매 스레드에 전달 (보유수량 기준 포지션 갱신 후 바로 다시 판단)"""
+    i = etf_state.index.get(fill["stock_code"])
+    if i is None:
+        return
+    side = "매수" if fill["side"] == "buy" else "매도"
+    quantity = execution_tracker.get_position(fill["stock_code"])
+    print(f"📬 체결 통보: {etf_state.names[i]} {side} {fill['quantity']}주 @ {fill['price']:,}원 (보유 {quantity}주)")
+    market_queue.put((FEED_FILL, i), (time.monotonic_ns(),))
+
+execution_tracker.add_callback(on_fill)
 
 # ==============================================================================
 # ========== 3. 매매 로직 실행 (Trading Logic) ==========
 # ==============================================================================
+def wait_for_update():
+    """갱신이 올 때까지 대기 (최대 STATUS_INTERVAL) → {(FEED_*, 종목 번호): 최신 값}"""
+    batch = market_queue.get_batch(STATUS_INTERVAL)
+    if COALESCE_WINDOW_MS and batch:
+        # 같은 묶음으로 도착하는 갱신을 모은 뒤 최신 값으로 한 번만 판단
+        time.sleep(COALESCE_WINDOW_MS / 1000)
+        batch.update(market_queue.get_batch(0))
+    return batch
+
+def apply_updates(batch):
+    """전달 큐에서 꺼낸 갱신을 etf_state 에 반영 → (갱신된 종목 번호, 가장 최근 수신 시각)"""
+    slots = set()
+    last_ns = 0
+    for (feed, i), value in batch.items():
+        recv_ns = value[0]
+        if feed == FEED_STALE:
+            # 끊김 이후 새로 수신된 시세는 수신 시각으로 구분되므로 묶음 안의 순서와 무관
+            etf_state.mark_stale(recv_ns)
+            continue
+        if feed == FEED_NAV:
+            etf_state.nav[i] = value[1]
+            etf_state.nav_recv_ns[i] = recv_ns
+        elif feed == FEED_PRICE:
+            etf_state.price_exch_time[i] = value[1]
+            etf_state.price[i] = value[2]
+            etf_state.price_recv_ns[i] = recv_ns
+        else:  # FEED_FILL
+            etf_state.holding[i] = execution_tracker.get_position(etf_state.codes[i]) > 0
+        slots.add(i)
+        if recv_ns > last_ns:
+            last_ns = recv_ns
+    return slots, last_ns
+
+def print_status():
+    now_str = datetime.now().strftime('%H:%M:%S')
+    now_ns = time.monotonic_ns()
+    print(f"\n[{now_str}] 보유 {int(etf_state.holding.sum())}/{len(etf_state)} 종목")
+    waiting = 0
+    for i, stock_code in enumerate(etf_state.codes):
+        if not etf_state.has_quotes(i):
+            waiting += 1
+            continue
+        line = f"  - {etf_state.names[i]} ({stock_code}) [{position_label(i).upper()}]"
+        if etf_state.is_stale(i):
+            line += " [STALE]"
+        exch_time = format_hhmmss(int(etf_state.price_exch_time[i]))
+        print(f"{line} NAV {etf_state.nav[i]} | 현재가 {etf_state.price[i]:.0f} (체결 {exch_time}) "
+              f"| 괴리율 {etf_state.spread(i):+.2f} 원 | 수신 {etf_state.quote_age_ms(i, now_ns):,.0f}ms 전"
+              + (" | 체결 대기" if HTS_ID and execution_tracker.has_pending(stock_code) else ""))
+    if waiting:
+        print(f"  - 시세 수신 대기 중: {waiting}개 종목")
+    print(f"  - 수신 큐: {market_queue.format_stats()}")
+
+def order_cooling_down(i, now_ns):
+    """종목 i 의 주문이 전송 중이거나 마지막 시도 후 ORDER_RETRY_COOLDOWN 이 지나지 않았는지"""
+    last_ns = etf_state.last_order_ns[i]
+    return last_ns != 0 and now_ns - last_ns < ORDER_RETRY_COOLDOWN * 1e9
+
+def place_order(i, side, signal_ns):
+    """종목 i 매수/매도 주문 → 성공 시 포지션 상태 변경 (체결통보 사용 시 체결 시점에 변경)
+
+    결과와 관계없이 전송 직전과 완료 시각을 last_order_ns 에 기록하여 재주문 간격을 제한합니다.
+    주문 중 예외(연결 끊김·타임아웃 등)는 실패한 시도로 처리하여 매매 스레드가 멈추지 않도록 합니다.
+    """
+    stock_code = etf_state.codes[i]
+    quantity = int(etf_state.quantity[i])
+    order = buy_etf if side == "buy" else sell_etf
+    etf_state.last_order_ns[i] = time.monotonic_ns()
+    try:
+        result = order(
+            ACCESS_TOKEN, BASE_URL, APP_KEY, APP_SECRET, ACCOUNT_NO,
+            stock_code, quantity, etf_state.names[i], signal_ns=signal_ns
+        )
+    except Exception as e:
+        label = "매수" if side == "buy" else "매도"
+        print(f"❌ {etf_state.names[i]} ({stock_code}) {label} 주문 오류: {type(e).__name__}: {e}")
+        result = None
+    finally:
+        etf_state.last_order_ns[i] = time.monotonic_ns()
+    if result and result.get("rt_cd") == "0":
+        if HTS_ID:
+            execution_tracker.register_order(result["output"]["ODNO"], stock_code, side, quantity, signal_ns)
+        else:
+            etf_state.holding[i] = side == "buy"
+
+def evaluate_symbol(i, now_ns):
+    """종목 i 의 NAV와 현재가를 비교하여 매매 조건을 확인하고 실행"""
+    # NAV와 현재가 데이터가 모두 수신된 경우에만 로직 실행
+    if not etf_state.has_quotes(i):
+        return
+
+    # 연결이 끊겼던 종목은 NAV·현재가가 모두 새로 들어오기 전까지 판단하지 않음
+    if etf_state.stale_ns[i]:
+        if etf_state.is_stale(i):
+            return
+        connection_gaps.record("symbol_recovery", now_ns - etf_state.stale_ns[i])
+        etf_state.stale_ns[i] = 0
+
+    # 체결통보를 기다리는 주문이 있으면 중복 주문 방지
+    if HTS_ID and execution_tracker.has_pending(etf_state.codes[i]):
+        return
+
+    # 직전 주문 시도 후 재주문 대기 중
+    if order_cooling_down(i, now_ns):
+        return
+
+    # 오래된 시세로는 판단하지 않음
+    if MAX_QUOTE_AGE_MS and etf_state.quote_age_ms(i, now_ns) > MAX_QUOTE_AGE_MS:
+        return
+
+    diff = etf_state.spread(i)
+
+    # --- 매수 조건 ---
+    # 조건: NAV가 현재가보다 buy_spread 이상 높고, 현재 보유하고 있지 않을 때
+    if diff >= etf_state.buy_spread[i] and not etf_state.holding[i]:
+        signal_ns = time.perf_counter_ns()
+        print(f"  >> {etf_state.names[i]} 매수 신호 발생 (NAV - 현재가 >= {etf_state.buy_spread[i]:g})")
+        place_order(i, "buy", signal_ns)
+
+    # --- 매도 조건 ---
+    # 조건: NAV - 현재가가 sell_spread 미만이고, 현재 보유하고 있을 때
+    elif diff < etf_state.sell_spread[i] and etf_state.holding[i]:
+        signal_ns = time.perf_counter_ns()
+        print(f"  >> {etf_state.names[i]} 매도 신호 발생 (NAV - 현재가 < {etf_state.sell_spread[i]:g})")
+        place_order(i, "sell", signal_ns)
+
 def run_trading_logic():
-    """1초마다 NAV와 현재가를 비교하여 매매 조건을 확인하고 실행하는 함수"""
-    global position
-    
+    """시세가 갱신될 때마다 갱신된 종목만 NAV와 현재가를 비교하여 매매 조건을 확인하고 실행하는 함수"""
+    last_status = 0.0
     while True:
-        time.sleep(1) # 1초 대기
+        batch = wait_for_update()
+        slots, tick_ns = apply_updates(batch)
         
-        nav = realtime_data.get("nav")
-        price = realtime_data.get("current_price")
+        # 현재 상태 출력 (판단은 갱신마다, 출력은 STATUS_INTERVAL 마다)
+        now = time.monotonic()
+        if now - last_status >= STATUS_INTERVAL:
+            if HTS_ID:
+                resync_expired_orders()
+            print_status()
+            last_status = now
         
-        # 현재 상태 출력
-        now_str = datetime.now().strftime('%H:%M:%S')
-        print(f"\n[{now_str}] 현재 포지션: {position.upper()}")
-        print(f"  - NAV      : {nav if nav is not None else '수신 대기 중...'}")
-        print(f"  - 현재가   : {price if price is not None else '수신 대기 중...'}")
+        if not slots:
+            continue
+        now_ns = time.monotonic_ns()
+        order_latency.record("tick_to_decision", now_ns - tick_ns)
         
-        # NAV와 현재가 데이터가 모두 수신된 경우에만 로직 실행
-        if nav is not None and price is not None:
-            diff = nav - price
-            print(f"  - 괴리율   : {diff:+.2f} 원")
-
-            # --- 매수 조건 ---
-            # 조건: NAV가 현재가보다 15원 이상 높고, 현재 보유하고 있지 않을 때
-            if diff >= 15 and position == "none":
-                print("  >> 매수 신호 발생 (NAV - 현재가 >= 100)")
-                result = buy_etf(stock_code=STOCK_CODE, quantity=1)
-                # 매수 주문 성공 시 포지션 상태 변경
-                if result and result.get("rt_cd") == "0":
-                    position = "holding"
-
-            # --- 매도 조건 ---
-            # 조건: NAV가 현재가보다 낮고 (괴리율 음수), 현재 보유하고 있을 때
-            elif diff < 0 and position == "holding":
-                print("  >> 매도 신호 발생 (NAV - 현재가 < 0)")
-                result = sell_etf(stock_code=STOCK_CODE, quantity=1)
-                # 매도 주문 성공 시 포지션 상태 변경
-                if result and result.get("rt_cd") == "0":
-                    position = "none"
+        # 종목 수와 무관하게 이번에 갱신된 종목만 판단
+        for i in slots:
+            evaluate_symbol(i, now_ns)
+
+# ==============================================================================
+# ========== 4. 웹소켓 연결 감시 (Reconnect Supervisor) ==========
+# ==============================================================================
+def reconnect_delay(attempt):
+    """재연결 대기 시간: 지수 백오프 상한의 50~100% 사이 무작위 (동시 재접속 분산)"""
+    cap = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * (2 ** attempt))
+    return cap / 2 + random.uniform(0, cap / 2)
+
+def run_websocket():
+    """연결이 끊기면 백오프 후 새 연결을 열고 on_open 에서 전 종목을 다시 구독 (종료 요청 시까지 반복)"""
+    global reconnect_attempt
+    while not shutdown.is_set():
+        ws = websocket.WebSocketApp(
+            WS_URL,
+            on_message=on_message,
+            on_error=on_error,
+            on_close=on_close,
+            on_open=on_open
+        )
+        ws.run_forever(ping_interval=PING_INTERVAL, ping_timeout=PING_TIMEOUT)
+        if shutdown.is_set():
+            break
+        mark_disconnected()
+        delay = reconnect_delay(reconnect_attempt)
+        reconnect_attempt += 1
+        print(f"🔌 웹소켓 끊김: 전 종목 STALE, {delay:.1f}초 후 재연결 (시도 {reconnect_attempt})")
+        shutdown.wait(delay)
+
+def request_shutdown(signum, frame):
+    """Ctrl+C: run_forever 가 KeyboardInterrupt 를 삼키므로 종료 여부를 따로 표시"""
+    shutdown.set()
+    raise KeyboardInterrupt
 
 # ==============================================================================
-# ========== 4. 메인 프로그램 실행 (Main Execution) ==========
+# ========== 5. 메인 프로그램 실행 (Main Execution) ==========
 # ==============================================================================
 if __name__ == "__main__":
     print("=" * 60)
     print("=== 자동 ETF 괴리율 매매 프로그램을 시작합니다 ===")
-    print(f"=== 대상 종목: {STOCK_NAME} ({STOCK_CODE}) ===")
+    print(f"=== 대상 종목: {len(etf_state)}개 ({', '.join(etf_state.names)}) ===")
     print("=" * 60)
     
+    # 0. 서버 종류에 맞는 REST 유량 설정 및 keep-alive 연결 확보 (주문 시 핸드셰이크 생략)
+    configure_rate_limit(BASE_URL)
+    start_health_check(BASE_URL)
+
     # 1. API 접근 토큰 발급
     if not get_access_token():
         exit() # 토큰 발급 실패 시 프로그램 종료
+    token_cache.start_token_refresher(BASE_URL, APP_KEY, APP_SECRET, on_refresh=on_token_refresh)
         
     # 2. 초기 보유 잔고 확인 및 포지션 설정
-    get_initial_balance(STOCK_CODE)
+    get_initial_balance()
+
+    # 2-1. 종목별 고정 수량 주문의 해시키를 미리 받아두어 주문 시 해시키 왕복 제거
+    for i, stock_code in enumerate(etf_state.codes):
+        prefetch_hashkey(BASE_URL, APP_KEY, APP_SECRET, ACCOUNT_NO, stock_code, int(etf_state.quantity[i]))
+    
+    # 2-2. 수신 프레임 기록 시작
+    if RECORD_DIR:
+        frame_recorder = FrameRecorder("live_trading", RECORD_DIR).start()
     
     # 3. 매매 로직을 별도의 스레드에서 실행
     trading_thread = threading.Thread(target=run_trading_logic, daemon=True)
     trading_thread.start()
     
-    # 4. 메인 스레드에서 웹소켓 실행
-    ws = websocket.WebSocketApp(
-        WS_URL,
-        on_message=on_message,
-        on_error=on_error,
-        on_close=on_close,
-        on_open=on_open
-    )
-    ws.run_forever()
\ No newline at end of file
+    # 4. 메인 스레드에서 웹소켓 실행 (끊기면 자동 재연결)
+    signal.signal(signal.SIGINT, request_shutdown)
+    try:
+        run_websocket()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_session()
+        if frame_recorder is not None:
+            frame_recorder.close()
+            print(f"💾 수신 프레임 {frame_recorder.frames:,}건 기록: {frame_recorder.path}")
+        # 종료 시 주문 경로 구간별 지연 요약 출력 및 저장
+        order_latency.print_summary()
+        order_latency.dump(LATENCY_DUMP_PATH)
+        if connection_gaps.snapshot():
+            print("🔌 웹소켓 끊김 구간 (ws_gap: 첫 시세까지, symbol_recovery: 종목 매매 재개까지)")
+            for line in connection_gaps.summary_lines():
+                print(line)
\ No newline at end of file
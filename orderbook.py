@@ -0,0 +1,125 @@
+import numpy as np
+
+from realtime_decoder import (
+    ASP_ASK_PRICE, ASP_BID_VOLUME, ASP_DEPTH, ASP_EXCH_TIME, ASP_TOTAL_ASK_VOLUME, ASP_TOTAL_BID_VOLUME,
+)
+
+# ==============================================================================
+# ========== 10단계 호가창 (H0STASP0 → 고정 NumPy 배열에 제자리 갱신) ==========
+# ==============================================================================
+# H0STASP0 은 매도호가 1~10, 매수호가 1~10, 매도잔량 1~10, 매수잔량 1~10 이 연속으로 오므로
+# (4 × 10) 정수 배열 하나에 필드 40개를 그대로 덮어씁니다. (틱당 리스트·배열 할당 없음)
+# 행: ASK_PRICE / BID_PRICE / ASK_VOLUME / BID_VOLUME, 열: 1호가(0) ~ 10호가(9)
+ASK_PRICE, BID_PRICE, ASK_VOLUME, BID_VOLUME = range(4)
+ASK, BID = "ask", "bid"  # 매수 주문은 매도호가(ASK)를, 매도 주문은 매수호가(BID)를 소진
+
+
+class OrderBook:
+    """종목 1개의 10단계 호가"""
+
+    def __init__(self, stock_code, depth=ASP_DEPTH):
+        self.stock_code = stock_code
+        self.depth = depth
+        self.levels = np.zeros((4, depth), dtype=np.int64)
+        self.total_volumes = np.zeros(2, dtype=np.int64)  # [총 매도잔량, 총 매수잔량]
+        # 변환용 임시 배열 (잘못된 필드가 있으면 levels 를 건드리지 않도록 먼저 여기에 변환)
+        self._scratch = np.zeros(4 * depth + 2, dtype=np.int64)
+        self.exch_time = 0  # 호가시간 HHMMSS
+        self.seq = 0        # 갱신 횟수
+        # 행 뷰 (levels 와 메모리 공유)
+        self.ask_prices = self.levels[ASK_PRICE]
+        self.bid_prices = self.levels[BID_PRICE]
+        self.ask_volumes = self.levels[ASK_VOLUME]
+        self.bid_volumes = self.levels[BID_VOLUME]
+
+    def update(self, fields):
+        """H0STASP0 레코드 하나(필드 목록)로 호가 전체를 덮어씀
+
+        필드 변환에 실패하면 ValueError 를 내고 기존 호가는 그대로 둡니다.
+        """
+        n = 4 * self.depth
+        scratch = self._scratch
+        scratch[:n] = fields[ASP_ASK_PRICE:ASP_BID_VOLUME + self.depth]
+        scratch[n:] = fields[ASP_TOTAL_ASK_VOLUME:ASP_TOTAL_BID_VOLUME + 1]
+        self.levels.ravel()[:] = scratch[:n]
+        self.total_volumes[:] = scratch[n:]
+        exch_time = fields[ASP_EXCH_TIME]
+        if exch_time.isdigit():
+            self.exch_time = int(exch_time)
+        self.seq += 1
+
+    # ---------------- 조회 ----------------
+    @property
+    def ready(self):
+        return self.seq > 0 and self.ask_prices[0] > 0 and self.bid_prices[0] > 0
+
+    def best_ask(self):
+        return int(self.ask_prices[0])
+
+    def best_bid(self):
+        return int(self.bid_prices[0])
+
+    def mid(self):
+        return (self.ask_prices[0] + self.bid_prices[0]) / 2
+
+    def spread(self):
+        return int(self.ask_prices[0] - self.bid_prices[0])
+
+    def imbalance(self, levels=None):
+        """(매수잔량 - 매도잔량) / 합계, 상위 levels 단계 기준 (-1 ~ 1)"""
+        n = levels or self.depth
+        bid = int(self.bid_volumes[:n].sum())
+        ask = int(self.ask_volumes[:n].sum())
+        return (bid - ask) / (bid + ask) if bid + ask else 0.0
+
+    def _side(self, side):
+        if side == ASK:
+            return self.ask_prices, self.ask_volumes
+        return self.bid_prices, self.bid_volumes
+
+    def available_quantity(self, side, limit_price):
+        """limit_price 까지 소진 가능한 잔량 (매수: 매도호가 <= limit, 매도: 매수호가 >= limit)"""
+        prices, volumes = self._side(side)
+        within = (prices <= limit_price) if side == ASK else (prices >= limit_price)
+        return int(volumes[within & (prices > 0)].sum())
+
+    def sweep(self, side, quantity):
+        """시장가로 quantity 를 체결할 때 (평균 체결가, 체결 가능 수량) — 10단계를 넘는 잔량은 제외"""
+        prices, volumes = self._side(side)
+        remaining = quantity
+        cost = 0
+        for price, volume in zip(prices.tolist(), volumes.tolist()):
+            if remaining <= 0 or price <= 0:
+                break
+            take = min(remaining, volume)
+            cost += take * price
+            remaining -= take
+        filled = quantity - remaining
+        return (cost / filled if filled else 0.0), filled
+
+    def impact_bps(self, side, quantity):
+        """quantity 시장가 체결 시 중간가 대비 불리한 가격 차이 (bp, 잔량 부족 시 None)"""
+        avg_price, filled = self.sweep(side, quantity)
+        if filled < quantity or not self.ready:
+            return None
+        mid = self.mid()
+        diff = avg_price - mid if side == ASK else mid - avg_price
+        return diff / mid * 10000
+
+
+class OrderBookStore:
+    """종목코드 → OrderBook (처음 보는 종목은 자동 생성)"""
+
+    def __init__(self):
+        self.books = {}
+
+    def get(self, stock_code):
+        book = self.books.get(stock_code)
+        if book is None:
+            book = self.books[stock_code] = OrderBook(stock_code)
+        return book
+
+    def update(self, stock_code, fields):
+        book = self.get(stock_code)
+        book.update(fields)
+        return book
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+# ==============================================================================
+# ========== 종목별 최신 체결가/호가 저장소 (버전 + 종목별 순번 + 일관된 스냅샷) ==========
+# ==============================================================================
+# 값은 (종목 수 × 3) NumPy 배열 하나에 [체결가, 매도1호가, 매수1호가] 로 보관합니다.
+# 쓰기는 프레임 단위로 apply() 한 번에 반영하며, 그동안 version 이 홀수가 됩니다(seqlock).
+# 읽기는 잠금 없이 필요한 행만 복사하고, 복사 전후 version 이 같을 때만 채택하므로
+# 여러 종목에 걸쳐 같은 시점의 값만 보게 됩니다. version 이 그대로면 이전 스냅샷을 그대로 씁니다.
+PRICE, ASK, BID = 0, 1, 2
+DEFAULT_CAPACITY = 256
+
+
+class PriceStore:
+    """종목코드 → 최신 체결가/호가 (쓰기 스레드·태스크 1개 + 읽기 여러 개)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.index = {}   # 종목코드 → 행 번호
+        self.codes = []
+        self._values = np.full((capacity, 3), np.nan)
+        self._seq = np.zeros(capacity, dtype=np.int64)  # 종목별 갱신 순번
+        self.version = 0  # 전체 갱신 순번 ×2 (홀수: 쓰는 중)
+        self._write_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def slot(self, code):
+        """종목코드의 행 번호 (처음 보는 종목은 등록, 배열이 차면 두 배로 확장)"""
+        i = self.index.get(code)
+        if i is not None:
+            return i
+        with self._write_lock:
+            i = self.index.get(code)
+            if i is not None:
+                return i
+            i = len(self.codes)
+            if i == len(self._seq):
+                self.version += 1
+                self._values = np.concatenate((self._values, np.full_like(self._values, np.nan)))
+                self._seq = np.concatenate((self._seq, np.zeros_like(self._seq)))
+                self.version += 1
+            self.codes.append(code)
+            self.index[code] = i
+            return i
+
+    def apply(self, updates):
+        """프레임 하나의 갱신을 한 번에 반영: [(종목코드, 체결가, 매도1호가, 매수1호가)] (없는 값은 None)"""
+        slots = [self.slot(code) for code, _, _, _ in updates]
+        with self._write_lock:
+            values, seq = self._values, self._seq
+            self.version += 1
+            for i, (_, price, ask, bid) in zip(slots, updates):
+                if price is not None:
+                    values[i, PRICE] = price
+                if ask is not None:
+                    values[i, ASK] = ask
+                if bid is not None:
+                    values[i, BID] = bid
+                seq[i] += 1
+            self.version += 1
+
+    def read(self, slots):
+        """slots 행의 (값 복사본, 순번 복사본, version) — 쓰는 도중이면 끝날 때까지 재시도"""
+        while True:
+            version = self.version
+            if version & 1:
+                time.sleep(0)
+                continue
+            values = self._values[slots]
+            seq = self._seq[slots]
+            if self.version == version:
+                return values, seq, version
+
+    def seq(self, code):
+        """종목의 갱신 순번 (미수신이면 0)"""
+        i = self.index.get(code)
+        return 0 if i is None else int(self._seq[i])
+
+
+class BasketView:
+    """ETF + 구성종목 묶음의 스냅샷 생성기
+
+    스냅샷은 기존 가격 dict 와 같은 키를 제공합니다:
+      "ETF", "{ETF}_ask", "{ETF}_bid", "{종목}", "{종목}_ask", "{종목}_bid"
+    """
+
+    def __init__(self, store, etf_code, component_codes):
+        self.store = store
+        self.codes = [etf_code] + list(component_codes)
+        self.slots = np.array([store.slot(code) for code in self.codes], dtype=np.intp)
+        # 키 → (스냅샷 행, 열)
+        self.keys = {"ETF": (0, PRICE), f"{etf_code}_ask": (0, ASK), f"{etf_code}_bid": (0, BID)}
+        for row, code in enumerate(self.codes[1:], start=1):
+            self.keys[code] = (row, PRICE)
+            self.keys[f"{code}_ask"] = (row, ASK)
+            self.keys[f"{code}_bid"] = (row, BID)
+        self.row_keys = [[k for k, (r, _) in self.keys.items() if r == row] for row in range(len(self.codes))]
+        self._last = None
+
+    def snapshot(self):
+        """묶음 전체의 같은 시점 값 (저장소가 갱신되지 않았으면 직전 스냅샷 재사용)"""
+        last = self._last
+        if last is not None and last.version == self.store.version:
+            return last
+        values, seq, version = self.store.read(self.slots)
+        self._last = BasketSnapshot(self, values, seq, version)
+        return self._last
+
+
+class BasketSnapshot(Mapping):
+    """변경되지 않는 묶음 가격 스냅샷 (체결가가 없는 종목은 키가 없음, 호가가 없으면 체결가로 대체)"""
+
+    def __init__(self, view, values, seq, version):
+        self.view = view
+        self.values = values
+        self.seq = seq          # 종목별 갱신 순번 (view.codes 순서)
+        self.version = version
+        self.valid = values[:, PRICE] > 0
+
+    def __getitem__(self, key):
+        row, col = self.view.keys[key]
+        price = self.values[row, PRICE]
+        if not price > 0:
+            raise KeyError(key)
+        if col != PRICE:
+            quote = self.values[row, col]
+            if quote == quote:  # nan 이 아니면 호가 사용
+                return float(quote)
+        return float(price)
+
+    def __iter__(self):
+        for row in np.flatnonzero(self.valid):
+            yield from self.view.row_keys[row]
+
+    def __len__(self):
+        return 3 * int(self.valid.sum())
+
+    def copy(self):
+        """스냅샷은 변경되지 않으므로 그대로 반환 (진입 가격 보관용)"""
+        return self
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+# ==============================================================================
+# ========== 프로세스 전역 토큰 버킷 (REST API 유량 제어) ==========
+# ==============================================================================
+# KIS Developers 안내 유량: 실전투자 초당 20건, 모의투자 초당 5건
+REAL_RATE_PER_SEC = 20
+MOCK_RATE_PER_SEC = 5
+# 버킷 크기 1: 호출 간격을 1/rate 초로 맞춰 어떤 1초 구간에서도 한도를 넘지 않음
+DEFAULT_BURST = 1
+
+
+class TokenBucket:
+    """스레드/asyncio 겸용 토큰 버킷
+
+    토큰이 없으면 실패하지 않고 다음 토큰 시점까지 대기하므로,
+    동시에 몰린 요청은 도착 순서대로 줄을 서서 나갑니다.
+    """
+
+    def __init__(self, rate, burst=DEFAULT_BURST):
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, n=1):
+        """토큰 n개를 예약하고 사용 가능 시점까지 남은 대기 시간(초) 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= n
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, n=1):
+        """토큰을 얻을 때까지 블로킹 대기"""
+        wait = self._reserve(n)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, n=1):
+        """토큰을 얻을 때까지 이벤트 루프를 막지 않고 대기"""
+        wait = self._reserve(n)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def set_rate(self, rate, burst=None):
+        """유량 변경 (남은 토큰은 새 버킷 크기로 잘라냄)"""
+        with self._lock:
+            self.rate = float(rate)
+            if burst is not None:
+                self.capacity = float(max(1, burst))
+            self._tokens = min(self._tokens, self.capacity)
+
+
+# 기본값은 더 보수적인 모의투자 유량
+_limiter = TokenBucket(MOCK_RATE_PER_SEC)
+
+
+def get_rate_limiter():
+    """프로세스 전역 REST 유량 제한기 반환"""
+    return _limiter
+
+
+def is_mock_url(base_url):
+    """모의투자 서버 URL 여부"""
+    return "openapivts" in base_url
+
+
+def configure_rate_limit(base_url=None, rate=None, burst=None):
+    """서버 종류(모의/실전) 또는 지정한 값으로 전역 유량 설정"""
+    if rate is None:
+        rate = MOCK_RATE_PER_SEC if base_url is None or is_mock_url(base_url) else REAL_RATE_PER_SEC
+    _limiter.set_rate(rate, burst)
+    return _limiter
@@ -0,0 +1,142 @@
+# ==============================================================================
+# ========== 실시간 시세 프레임 디코더 ('암호화|tr_id|건수|필드^필드^...') ==========
+# ==============================================================================
+# 체결가(H0STCNT0)는 레코드당 46개 필드지만 매매 로직은 앞쪽 몇 개만 사용합니다.
+# fast 디코더는 전체를 split 하지 않고 필요한 앞쪽 필드까지만 잘라냅니다.
+# tr_id 별로 fast / split 구현을 선택할 수 있습니다. (bench_realtime_decoder.py 로 비교)
+# 부하가 높으면 한 프레임에 여러 레코드가 묶여 오므로(건수 > 1) decode_records 로 모두 꺼내 씁니다.
+
+# H0STCNT0 필드 인덱스
+CNT_STOCK_CODE = 0
+CNT_EXCH_TIME = 1   # 체결시간 HHMMSS (정수로 변환, 예: 93005 → 09:30:05)
+CNT_PRICE = 2       # 현재가(체결가)
+CNT_ASK1 = 10       # 매도 1호가
+CNT_BID1 = 11       # 매수 1호가
+CNT_VOLUME = 12     # 체결거래량
+
+# H0STNAV0 필드 인덱스
+NAV_STOCK_CODE = 0
+NAV_VALUE = 1       # NAV
+
+# H0STASP0 필드 인덱스 (호가 1~10단계가 가격·잔량별로 10개씩 연속)
+ASP_STOCK_CODE = 0
+ASP_EXCH_TIME = 1         # 호가시간 HHMMSS
+ASP_ASK_PRICE = 3         # 매도호가 1~10 (3~12)
+ASP_BID_PRICE = 13        # 매수호가 1~10 (13~22)
+ASP_ASK_VOLUME = 23       # 매도호가 잔량 1~10 (23~32)
+ASP_BID_VOLUME = 33       # 매수호가 잔량 1~10 (33~42)
+ASP_TOTAL_ASK_VOLUME = 43  # 총 매도호가 잔량
+ASP_TOTAL_BID_VOLUME = 44  # 총 매수호가 잔량
+ASP_DEPTH = 10
+
+
+def frame_header(message):
+    """'0|tr_id|건수|...' 프레임 → (tr_id, 건수 문자열, 데이터 시작 위치)"""
+    p1 = message.find("|", 2)
+    p2 = message.find("|", p1 + 1)
+    return message[2:p1], message[p1 + 1:p2], p2 + 1
+
+
+def leading_fields(message, start, n):
+    """start 위치(첫 필드 시작)부터 앞쪽 n 개 필드만 반환
+
+    split 의 maxsplit 로 필요한 필드까지만 C 레벨에서 잘라내고,
+    헤더가 붙어 있는 첫 필드만 start 기준으로 다시 자릅니다. (나머지 필드는 문자열 하나로 남음)
+    """
+    fields = message.split("^", n)
+    fields[0] = fields[0][start:]
+    return fields
+
+
+def record_count(count_str):
+    """프레임 헤더의 건수 필드 → 레코드 수 (잘못된 값이면 1)"""
+    return int(count_str) if count_str.isdigit() and int(count_str) > 0 else 1
+
+
+def split_records(message, start, count):
+    """데이터 부분을 레코드별 필드 목록으로 분리 (여러 레코드는 '^' 로 이어져 옴)"""
+    fields = message[start:].split("^")
+    if count <= 1:
+        return [fields]
+    size = len(fields) // count
+    return [fields[i * size:(i + 1) * size] for i in range(count)]
+
+
+def format_hhmmss(hhmmss):
+    """정수 HHMMSS → 'HH:MM:SS' (출력할 때만 사용)"""
+    hh, rest = divmod(hhmmss, 10000)
+    mm, ss = divmod(rest, 100)
+    return f"{hh:02d}:{mm:02d}:{ss:02d}"
+
+
+# ---------------- H0STCNT0: (종목코드, 체결시간 HHMMSS 정수, 현재가, 체결량, 매수1호가, 매도1호가) ----------------
+def stock_tick_from_fields(fields):
+    if len(fields) <= CNT_VOLUME:
+        return None
+    return (fields[CNT_STOCK_CODE], int(fields[CNT_EXCH_TIME]), int(fields[CNT_PRICE]),
+            int(fields[CNT_VOLUME]), int(fields[CNT_BID1]), int(fields[CNT_ASK1]))
+
+
+def decode_stock_tick_fast(message, start):
+    return stock_tick_from_fields(leading_fields(message, start, CNT_VOLUME + 1))
+
+
+def decode_stock_tick_split(message, start):
+    return stock_tick_from_fields(message.split("|")[3].split("^"))
+
+
+# ---------------- H0STNAV0: (종목코드, NAV) ----------------
+def nav_from_fields(fields):
+    if len(fields) <= NAV_VALUE:
+        return None
+    return fields[NAV_STOCK_CODE], float(fields[NAV_VALUE])
+
+
+def decode_nav_fast(message, start):
+    return nav_from_fields(leading_fields(message, start, NAV_VALUE + 1))
+
+
+def decode_nav_split(message, start):
+    return nav_from_fields(message.split("|")[3].split("^"))
+
+
+DECODERS = {
+    "H0STCNT0": {"fast": decode_stock_tick_fast, "split": decode_stock_tick_split},
+    "H0STNAV0": {"fast": decode_nav_fast, "split": decode_nav_split},
+}
+
+# 여러 레코드가 묶인 프레임에서 레코드 하나(필드 목록)를 변환하는 함수
+RECORD_BUILDERS = {
+    "H0STCNT0": stock_tick_from_fields,
+    "H0STNAV0": nav_from_fields,
+}
+
+# tr_id → 현재 사용 중인 디코더
+_active = {tr_id: impls["fast"] for tr_id, impls in DECODERS.items()}
+
+
+def set_decoder(tr_id, mode):
+    """tr_id 의 디코더 구현 선택 ('fast' / 'split')"""
+    _active[tr_id] = DECODERS[tr_id][mode]
+
+
+def get_decoder(tr_id):
+    """tr_id 의 현재 디코더 (등록되지 않은 tr_id 면 None)"""
+    return _active.get(tr_id)
+
+
+def decode_records(message, tr_id, count_str, start):
+    """프레임에 들어 있는 모든 레코드를 순서대로 디코딩한 목록 (frame_header 결과를 그대로 받음)
+
+    건수가 1이면 tr_id 별 선택된 디코더로 앞쪽 필드만 읽고,
+    여러 건이면 전체를 나눈 뒤 레코드마다 변환합니다.
+    """
+    count = record_count(count_str)
+    if count == 1:
+        decoder = _active.get(tr_id)
+        record = decoder(message, start) if decoder is not None else None
+        return [record] if record is not None else []
+    builder = RECORD_BUILDERS.get(tr_id)
+    if builder is None:
+        return []
+    return [r for r in map(builder, split_records(message, start, count)) if r is not None]
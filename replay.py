@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+import types
+from itertools import chain
+
+import websockets.exceptions
+
+from frame_recorder import DEFAULT_RECORD_DIR, list_segments, read_frames
+
+# ==============================================================================
+# ========== 기록된 웹소켓 세션 재생 (실제 수신 코드에 프레임 주입) ==========
+# ==============================================================================
+# frame_recorder 로 기록한 프레임을 원래 간격(speed=1), 배속(speed=N), 최대 속도(speed=0)로
+# live_trading.on_message / KISWebSocketClient.listen(parse_realtime_price) / get_rate.receive_data
+# 에 그대로 넣습니다. 대상 모듈의 time.monotonic_ns()/time_ns() 는 기록된 수신 시각을 따르는
+# 가상 시계로 바꿔 두므로, 시세 경과 시간 판단은 녹화 당시와 같게 동작합니다.
+_real_monotonic_ns = time.monotonic_ns
+
+
+class SimulatedClock:
+    """마지막으로 전달한 프레임의 기록 시각 + 그 이후 실제 경과 시간"""
+
+    def __init__(self):
+        self.recv_ns = _real_monotonic_ns()
+        self.wall_ns = time.time_ns()
+        self._delivered_ns = self.recv_ns
+
+    def advance_to(self, recv_ns, wall_ns):
+        self.recv_ns = recv_ns
+        self.wall_ns = wall_ns
+        self._delivered_ns = _real_monotonic_ns()
+
+    def monotonic_ns(self):
+        return self.recv_ns + (_real_monotonic_ns() - self._delivered_ns)
+
+    def time_ns(self):
+        return self.wall_ns + (_real_monotonic_ns() - self._delivered_ns)
+
+    def monotonic(self):
+        return self.monotonic_ns() / 1e9
+
+    def time(self):
+        return self.time_ns() / 1e9
+
+
+def _time_proxy(clock):
+    """time 모듈 대용: 시각 조회만 가상 시계, 나머지(sleep, perf_counter 등)는 실제 time"""
+    proxy = types.ModuleType("time")
+    proxy.__dict__.update(time.__dict__)
+    proxy.monotonic_ns = clock.monotonic_ns
+    proxy.time_ns = clock.time_ns
+    proxy.monotonic = clock.monotonic
+    proxy.time = clock.time
+    return proxy
+
+
+@contextlib.contextmanager
+def simulated_time(clock, *modules):
+    """modules 의 전역 time 을 가상 시계로 교체 (종료 시 복원, time 을 쓰지 않는 모듈은 건너뜀)"""
+    modules = [m for m in modules if hasattr(m, "time")]
+    originals = [(m, m.time) for m in modules]
+    proxy = _time_proxy(clock)
+    for m in modules:
+        m.time = proxy
+    try:
+        yield clock
+    finally:
+        for m, original in originals:
+            m.time = original
+
+
+# ---------------- 프레임 공급 ----------------
+def load_session(paths):
+    """기록 파일들을 순서대로 이어 (wall_ns, recv_ns, 프레임) 반환"""
+    return chain.from_iterable(read_frames(p) for p in paths)
+
+
+class Pacer:
+    """기록 간격에 맞춰 프레임 전달 시점 조절 (speed <= 0 이면 대기 없음)"""
+
+    def __init__(self, speed):
+        self.speed = speed
+        self._first_ns = None
+        self._start_ns = None
+
+    def delay(self, recv_ns):
+        """이 프레임을 전달하기까지 남은 시간 (초)"""
+        if self.speed <= 0:
+            return 0.0
+        now = _real_monotonic_ns()
+        if self._first_ns is None:
+            self._first_ns, self._start_ns = recv_ns, now
+            return 0.0
+        target = self._start_ns + (recv_ns - self._first_ns) / self.speed
+        return max(0.0, (target - now) / 1e9)
+
+
+class ReplayStats:
+    def __init__(self):
+        self.frames = 0
+        self.first_ns = None
+        self.last_ns = None
+        self.start_ns = _real_monotonic_ns()
+        self.end_ns = None
+
+    def add(self, recv_ns):
+        if self.first_ns is None:
+            self.first_ns = recv_ns
+        self.last_ns = recv_ns
+        self.frames += 1
+
+    def finish(self):
+        self.end_ns = _real_monotonic_ns()
+        return self
+
+    def summary(self):
+        elapsed = max(1, (self.end_ns or _real_monotonic_ns()) - self.start_ns) / 1e9
+        span = ((self.last_ns or 0) - (self.first_ns or 0)) / 1e9
+        return (f"프레임 {self.frames:,}건 | 기록 구간 {span:,.1f}초 → 재생 {elapsed:,.2f}초 "
+                f"({span / elapsed:,.1f}배속, {self.frames / elapsed:,.0f} 프레임/초)")
+
+
+class ReplayWebSocket:
+    """websockets 연결 대용: recv() 가 기록된 프레임을 차례로 돌려줌"""
+
+    def __init__(self, frames, speed, clock, stats, eof_exc):
+        self._frames = iter(frames)
+        self._pacer = Pacer(speed)
+        self._clock = clock
+        self._stats = stats
+        self._eof_exc = eof_exc
+
+    async def recv(self):
+        try:
+            wall_ns, recv_ns, message = next(self._frames)
+        except StopIteration:
+            self._stats.finish()
+            raise self._eof_exc()
+        delay = self._pacer.delay(recv_ns)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._clock.advance_to(recv_ns, wall_ns)
+        self._stats.add(recv_ns)
+        return message
+
+    async def send(self, message):
+        pass
+
+    async def pong(self, data=b""):
+        pass
+
+    async def close(self):
+        pass
+
+
+class _NullWebSocketApp:
+    """websocket-client WebSocketApp 대용 (on_message 의 ws 인자)"""
+
+    def pong(self, payload):
+        pass
+
+    def send(self, data):
+        pass
+
+
+# ---------------- 대상별 재생 ----------------
+def replay_live_trading(frames, speed=0, trade=False):
+    """live_trading.on_message 에 프레임 주입 (trade=True 면 매매 스레드도 실행, 주문은 로컬 스텁으로)"""
+    import threading
+    import live_trading
+
+    clock = SimulatedClock()
+    stats = ReplayStats()
+    server = None
+    if trade:
+        from kis_stub_server import start_stub_server
+        from rate_limiter import configure_rate_limit
+        server = start_stub_server()
+        live_trading.BASE_URL = server.base_url
+        live_trading.ACCESS_TOKEN = "replay-token"
+        configure_rate_limit(server.base_url)
+
+    ws = _NullWebSocketApp()
+    pacer = Pacer(speed)
+    with simulated_time(clock, live_trading):
+        if trade:
+            threading.Thread(target=live_trading.run_trading_logic, daemon=True).start()
+        for wall_ns, recv_ns, message in frames:
+            delay = pacer.delay(recv_ns)
+            if delay > 0:
+                time.sleep(delay)
+            clock.advance_to(recv_ns, wall_ns)
+            live_trading.on_message(ws, message)
+            stats.add(recv_ns)
+        stats.finish()
+        if trade:
+            time.sleep(live_trading.STATUS_INTERVAL)  # 마지막 판단·주문이 끝날 시간
+    if server is not None:
+        server.shutdown()
+    return stats
+
+
+def replay_stock_auto_mcp(frames, speed=0):
+    """KISWebSocketClient.listen (→ parse_realtime_price) 에 프레임 주입 → (통계, 클라이언트)"""
+    import ___StockAutoByMCP as mcp
+
+    clock = SimulatedClock()
+    stats = ReplayStats()
+    client = mcp.KISWebSocketClient("replay", "replay", is_mock=True)
+    # 입력이 끝나면 listen 이 정상 종료 경로(CancelledError)로 빠지도록 함
+    client.ws = ReplayWebSocket(frames, speed, clock, stats, asyncio.CancelledError)
+    with simulated_time(clock, mcp):
+        asyncio.run(client.listen())
+    return stats, client
+
+
+def replay_get_rate(frames, speed=0):
+    """get_rate.receive_data 에 프레임 주입"""
+    import get_rate
+
+    clock = SimulatedClock()
+    stats = ReplayStats()
+    ws = ReplayWebSocket(frames, speed, clock, stats,
+                         lambda: websockets.exceptions.ConnectionClosedOK(None, None))
+    with simulated_time(clock, get_rate):
+        asyncio.run(get_rate.receive_data(ws))
+    return stats
+
+
+TARGETS = ("live_trading", "mcp", "get_rate")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기록된 웹소켓 세션 재생")
+    parser.add_argument("target", choices=TARGETS)
+    parser.add_argument("files", nargs="*", help="기록 파일 (생략 시 --dir/--source/--date 로 검색)")
+    parser.add_argument("--dir", default=DEFAULT_RECORD_DIR)
+    parser.add_argument("--source", default="*", help="기록 출처 (live_trading / get_rate / stock_auto_mcp)")
+    parser.add_argument("--date", default="*", help="YYYYMMDD")
+    parser.add_argument("--speed", type=float, default=0, help="1: 실시간, N: N배속, 0: 최대 속도")
+    parser.add_argument("--trade", action="store_true", help="live_trading 매매 스레드 실행 (주문은 로컬 스텁 서버로)")
+    parser.add_argument("--quiet", action="store_true", help="대상 코드의 출력 숨김")
+    args = parser.parse_args()
+
+    paths = args.files or list_segments(args.dir, args.source, args.date)
+    if not paths:
+        raise SystemExit("재생할 기록 파일이 없습니다.")
+    print(f"▶️ {args.target} 재생: 파일 {len(paths)}개, 속도 {'최대' if args.speed <= 0 else f'{args.speed:g}배'}")
+
+    frames = load_session(paths)
+    with contextlib.ExitStack() as stack:
+        if args.quiet:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        if args.target == "live_trading":
+            stats = replay_live_trading(frames, args.speed, args.trade)
+        elif args.target == "mcp":
+            stats, _ = replay_stock_auto_mcp(frames, args.speed)
+        else:
+            stats = replay_get_rate(frames, args.speed)
+
+    print(f"⏹️ {stats.summary()}")
+    if args.target == "live_trading" and args.trade:
+        from latency import order_latency
+        order_latency.print_summary()
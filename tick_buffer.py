@@ -0,0 +1,109 @@
+import threading
+import numpy as np
+
+# ==============================================================================
+# ========== 종목별 고정 크기 시세 이력 (NumPy 구조화 배열 링버퍼) ==========
+# ==============================================================================
+# 배열은 생성 시 한 번만 할당하고, 틱마다 해당 칸을 덮어씁니다. (틱당 배열 할당 없음)
+# 전략은 window() 로 최근 N 개를 시간순으로 받아 벡터 연산에 바로 사용할 수 있습니다.
+TICK_DTYPE = np.dtype([
+    ("recv_ns", "i8"),     # 수신 시각 (time.monotonic_ns)
+    ("exch_time", "i4"),   # 거래소 시각 HHMMSS
+    ("price", "f8"),       # 체결가
+    ("volume", "i8"),      # 체결량 (호가 갱신이면 0)
+    ("bid", "f8"),         # 매수 1호가
+    ("ask", "f8"),         # 매도 1호가
+])
+SPREAD_DTYPE = np.dtype([
+    ("recv_ns", "i8"),
+    ("spread", "f8"),
+])
+DEFAULT_CAPACITY = 4096
+
+
+class RingBuffer:
+    """고정 크기 구조화 배열 링버퍼 (쓰기 스레드 1개 + 읽기 스레드 여러 개)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, dtype=TICK_DTYPE):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.count = 0  # 누적 기록 수 (다음 쓰기 위치 = count % capacity)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, row):
+        """dtype 필드 순서의 튜플 한 행 추가 (가장 오래된 행을 덮어씀)"""
+        with self._lock:
+            self.data[self.count % self.capacity] = row
+            self.count += 1
+
+    def last(self):
+        """가장 최근 행 (없으면 None)"""
+        with self._lock:
+            if self.count == 0:
+                return None
+            return self.data[(self.count - 1) % self.capacity].copy()
+
+    def window(self, n=None):
+        """최근 n 개 행을 오래된 순서로 반환 (복사본이므로 이후 쓰기와 무관)"""
+        with self._lock:
+            size = len(self)
+            n = size if n is None else min(n, size)
+            end = self.count % self.capacity
+            start = end - n
+            if start >= 0:
+                return self.data[start:end].copy()
+            return np.concatenate((self.data[start:], self.data[:end]))
+
+    def column(self, name, n=None):
+        """최근 n 개 행의 필드 하나 (예: column('price', 100))"""
+        return self.window(n)[name]
+
+
+class TickRing(RingBuffer):
+    """종목 1개의 체결/호가 이력
+
+    체결 틱에는 호가가, 호가 틱에는 체결가가 없으므로 직전 값을 이어 받아 채웁니다.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        super().__init__(capacity, TICK_DTYPE)
+        self._exch_time = 0
+        self._price = np.nan
+        self._bid = np.nan
+        self._ask = np.nan
+
+    def append_tick(self, recv_ns, exch_time=None, price=None, volume=0, bid=None, ask=None):
+        if exch_time is not None:
+            self._exch_time = exch_time
+        if price is not None:
+            self._price = price
+        if bid is not None:
+            self._bid = bid
+        if ask is not None:
+            self._ask = ask
+        self.append((recv_ns, self._exch_time, self._price, volume, self._bid, self._ask))
+
+
+class TickStore:
+    """종목코드 → TickRing (처음 보는 종목은 자동 생성)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.rings = {}
+        self._lock = threading.Lock()
+
+    def get(self, stock_code):
+        ring = self.rings.get(stock_code)
+        if ring is None:
+            with self._lock:
+                ring = self.rings.setdefault(stock_code, TickRing(self.capacity))
+        return ring
+
+    def append_tick(self, stock_code, recv_ns, exch_time=None, price=None, volume=0, bid=None, ask=None):
+        self.get(stock_code).append_tick(recv_ns, exch_time, price, volume, bid, ask)
+
+    def window(self, stock_code, n=None):
+        return self.get(stock_code).window(n)
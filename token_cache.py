@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+from kis_session import get_session
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ==============================================================================
+# ========== 접근 토큰 / 웹소켓 접속키 디스크 캐시 (프로세스 간 공유) ==========
+# ==============================================================================
+# 앱키 + 서버 종류(모의/실전) 별로 저장하고 expires_in 을 지켜 재사용합니다.
+# KIS 는 토큰 재발급을 1분당 1회로 제한하므로 스크립트 재시작 시에도 캐시를 우선 사용합니다.
+TOKEN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".kis_token_cache.json")
+EXPIRY_MARGIN = 600          # 만료 10분 전부터는 캐시를 쓰지 않고 재발급
+APPROVAL_KEY_TTL = 86400     # 웹소켓 접속키 유효기간 (응답에 expires_in 이 없음)
+
+
+class _FileLock:
+    """캐시 파일 잠금 (다른 프로세스·스레드와 동시 발급 방지, 진입마다 파일을 새로 열어 스레드끼리도 배타)"""
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self.fd)
+
+
+def _env(base_url):
+    return "mock" if "openapivts" in base_url else "real"
+
+
+def _cache_key(kind, base_url, app_key):
+    return f"{kind}:{_env(base_url)}:{app_key}"
+
+
+def _load(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(path, cache):
+    # 임시 파일에 쓴 뒤 교체하여 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 함
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+    try:
+        os.chmod(path, 0o600)
+    except OSError:
+        pass
+
+
+def _issue_access_token(base_url, app_key, app_secret):
+    """접근 토큰 신규 발급 → (토큰, 유효기간 초)"""
+    headers = {"content-type": "application/json"}
+    body = {"grant_type": "client_credentials", "appkey": app_key, "appsecret": app_secret}
+    response = get_session().post(f"{base_url}/oauth2/tokenP", headers=headers, data=json.dumps(body))
+    if response.status_code != 200:
+        print(f"❌ 접근 토큰 발급 실패: {response.text}")
+        return None, 0
+    data = response.json()
+    return data["access_token"], int(data.get("expires_in", 86400))
+
+
+def _issue_approval_key(base_url, app_key, app_secret):
+    """웹소켓 접속키 신규 발급 → (접속키, 유효기간 초)"""
+    headers = {"content-type": "application/json"}
+    body = {"grant_type": "client_credentials", "appkey": app_key, "secretkey": app_secret}
+    response = get_session().post(f"{base_url}/oauth2/Approval", headers=headers, data=json.dumps(body))
+    if response.status_code != 200:
+        print(f"❌ 웹소켓 접속키 발급 실패: {response.text}")
+        return None, 0
+    return response.json()["approval_key"], APPROVAL_KEY_TTL
+
+
+def _is_fresh(entry):
+    return bool(entry) and entry["expires_at"] - EXPIRY_MARGIN > time.time()
+
+
+def _get_or_issue(kind, issue_func, base_url, app_key, app_secret, force, path):
+    key = _cache_key(kind, base_url, app_key)
+    # 캐시 파일은 통째로 교체되므로 잠금 없이 읽음 (발급 중인 다른 스레드를 기다리지 않음)
+    entry = _load(path).get(key)
+    if not force and _is_fresh(entry):
+        return entry["value"]
+    seen = entry["expires_at"] if entry else None
+
+    # 발급은 파일 잠금 안에서 한 번 더 확인한 뒤에만 (그사이 다른 쪽이 발급했으면 그 값을 사용)
+    with _FileLock(path):
+        cache = _load(path)
+        entry = cache.get(key)
+        if _is_fresh(entry) and (not force or entry["expires_at"] != seen):
+            return entry["value"]
+
+        value, expires_in = issue_func(base_url, app_key, app_secret)
+        if value is None:
+            return None
+        cache[key] = {"value": value, "expires_at": time.time() + expires_in}
+        _save(path, cache)
+        return value
+
+
+def get_access_token(base_url, app_key, app_secret, force=False, path=TOKEN_CACHE_PATH):
+    """캐시된 접근 토큰 반환 (없거나 만료 임박 시 발급 후 저장)"""
+    return _get_or_issue("access_token", _issue_access_token, base_url, app_key, app_secret, force, path)
+
+
+def get_approval_key(base_url, app_key, app_secret, force=False, path=TOKEN_CACHE_PATH):
+    """캐시된 웹소켓 접속키 반환 (없거나 만료 임박 시 발급 후 저장)"""
+    return _get_or_issue("approval_key", _issue_approval_key, base_url, app_key, app_secret, force, path)
+
+
+def seconds_until_refresh(kind, base_url, app_key, path=TOKEN_CACHE_PATH):
+    """캐시 항목이 재발급 대상이 되기까지 남은 시간 (초)"""
+    entry = _load(path).get(_cache_key(kind, base_url, app_key))
+    if not entry:
+        return 0
+    return max(0, entry["expires_at"] - EXPIRY_MARGIN - time.time())
+
+
+def start_token_refresher(base_url, app_key, app_secret, on_refresh=None, path=TOKEN_CACHE_PATH):
+    """만료 전에 접근 토큰을 미리 재발급하는 데몬 스레드 시작
+
+    on_refresh(token) 은 새 토큰을 받을 때마다 호출됩니다.
+    """
+    def loop():
+        while True:
+            time.sleep(max(1, seconds_until_refresh("access_token", base_url, app_key, path)))
+            # 다른 프로세스가 이미 갱신했다면 캐시 값을 그대로 받음
+            token = get_access_token(base_url, app_key, app_secret, path=path)
+            if token is None:
+                time.sleep(60)
+                continue
+            if on_refresh is not None:
+                on_refresh(token)
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    return thread
@@ -1,5 +1,19 @@
-import requests
 import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from kis_session import get_session
+from latency import order_latency
+
+# --- 해시키 설정 ---
+# KIS 주문 API 에서 hashkey 헤더는 선택 항목이므로 False 로 두면 해시키 없이 바로 주문합니다.
+USE_HASHKEY = True
+HASHKEY_CACHE_SIZE = 256  # 본문 digest 기준 LRU 캐시 크기
+
+_hashkey_cache = OrderedDict()
+_hashkey_lock = threading.Lock()
 
 def get_hashkey(data, base_url, app_key, app_secret):
     """POST 요청시 필요한 해시키 생성"""
@@ -9,27 +23,65 @@ def get_hashkey(data, base_url, app_key, app_secret):
         "appkey": app_key,
         "appsecret": app_secret,
     }
-    response = requests.post(url, headers=headers, data=json.dumps(data))
+    response = get_session().post(url, headers=headers, data=encode_body(data))
     if response.status_code == 200:
         return response.json().get("HASH")
     else:
         print(f"❌ 해시키 생성 실패: {response.text}")
         return None
 
-# --------------------------------------------------------------
-def buy_etf(access_token, base_url, app_key, app_secret, account_no, stock_code, quantity, stock_name, tr_id="VTTC0802U"):
-    """시장가 매수 주문 (모듈화된 함수)"""
-    print(f"\n>>>> 🛒 {stock_name} {quantity}주 시장가 매수 주문 실행!")
-    path = "/uapi/domestic-stock/v1/trading/order-cash"
-    url = f"{base_url}{path}"
+def encode_body(data):
+    """요청 본문 바이트 (dict 는 json.dumps, 템플릿이 만든 bytes 는 그대로)"""
+    return data if isinstance(data, bytes) else json.dumps(data).encode()
+
+def _hashkey_digest(data, app_key):
+    """해시키 캐시 키 (앱키 + 실제 전송되는 본문 바이트의 digest)"""
+    return hashlib.sha256(app_key.encode() + b"|" + encode_body(data)).hexdigest()
+
+def lookup_hashkey(data, app_key):
+    """캐시된 해시키 조회 (없으면 None)"""
+    key = _hashkey_digest(data, app_key)
+    with _hashkey_lock:
+        hashkey = _hashkey_cache.get(key)
+        if hashkey is not None:
+            _hashkey_cache.move_to_end(key)
+        return hashkey
+
+def store_hashkey(data, app_key, hashkey):
+    """해시키를 캐시에 저장 (오래된 항목부터 제거)"""
+    key = _hashkey_digest(data, app_key)
+    with _hashkey_lock:
+        _hashkey_cache[key] = hashkey
+        _hashkey_cache.move_to_end(key)
+        while len(_hashkey_cache) > HASHKEY_CACHE_SIZE:
+            _hashkey_cache.popitem(last=False)
+
+def get_cached_hashkey(data, base_url, app_key, app_secret):
+    """LRU 캐시에서 해시키 조회, 없으면 생성 후 저장"""
+    hashkey = lookup_hashkey(data, app_key)
+    if hashkey is not None:
+        return hashkey
 
+    hashkey = get_hashkey(data, base_url, app_key, app_secret)
+    if hashkey:
+        store_hashkey(data, app_key, hashkey)
+    return hashkey
+
+def clear_hashkey_cache():
+    """해시키 캐시 비우기"""
+    with _hashkey_lock:
+        _hashkey_cache.clear()
+
+# --------------------------------------------------------------
+def build_order_body(account_no, stock_code, quantity):
+    """시장가 현금 주문 본문 생성 (매수/매도 공통)"""
     try:
         cano, acnt_prdt_cd = account_no.split('-')
     except Exception:
         print("❌ ACCOUNT_NO 포맷 오류 (예: '50154524-01')")
         return None
 
-    data = {
+    return {
         "CANO": cano,
         "ACNT_PRDT_CD": acnt_prdt_cd,
         "PDNO": stock_code,
@@ -38,78 +90,195 @@ def buy_etf(access_token, base_url, app_key, app_secret, account_no, stock_code,
         "ORD_UNPR": "0",
     }
 
-    hashkey = get_hashkey(data, base_url, app_key, app_secret)
-    if not hashkey:
+def prefetch_hashkey(base_url, app_key, app_secret, account_no, stock_code, quantity):
+    """자주 나갈 주문의 해시키를 미리 받아 캐시에 저장 (매수/매도 본문이 같으므로 한 번이면 충분)"""
+    data = build_order_body(account_no, stock_code, quantity)
+    if data is None:
         return None
+    return get_cached_hashkey(data, base_url, app_key, app_secret)
 
-    headers = {
-        "content-type": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "appkey": app_key,
-        "appsecret": app_secret,
-        "tr_id": tr_id,
-        "custtype": "P",
-        "hashkey": hashkey
-    }
+# --------------------------------------------------------------
+ORDER_PATH = "/uapi/domestic-stock/v1/trading/order-cash"
+ORDER_TEMPLATE_CACHE_SIZE = 512  # (종목, 매수/매도, 주문구분) 템플릿 LRU 크기
+
+_order_templates = OrderedDict()
+_template_lock = threading.Lock()
+
+class OrderTemplate:
+    """종목/매수·매도/주문구분별로 미리 만들어 둔 주문 요청 (수량·가격만 채워 넣음)"""
+    __slots__ = ("url", "headers", "body_prefix", "body_middle", "body_suffix")
+
+    def __init__(self, base_url, access_token, app_key, app_secret, account_no, stock_code, tr_id, ord_dvsn):
+        cano, acnt_prdt_cd = account_no.split('-')
+        self.url = f"{base_url}{ORDER_PATH}"
+        self.headers = {
+            "content-type": "application/json",
+            "authorization": f"Bearer {access_token}",
+            "appkey": app_key,
+            "appsecret": app_secret,
+            "tr_id": tr_id,
+            "custtype": "P",
+        }
+        # build_order_body + json.dumps 결과와 바이트 단위로 같도록 고정 부분을 미리 직렬화
+        static = json.dumps({
+            "CANO": cano,
+            "ACNT_PRDT_CD": acnt_prdt_cd,
+            "PDNO": stock_code,
+            "ORD_DVSN": ord_dvsn,
+        })
+        self.body_prefix = (static[:-1] + ', "ORD_QTY": "').encode()
+        self.body_middle = b'", "ORD_UNPR": "'
+        self.body_suffix = b'"}'
+
+    def render(self, quantity, price=0):
+        """수량·가격을 채운 본문 바이트"""
+        return b"".join((self.body_prefix, str(quantity).encode(), self.body_middle,
+                         str(price).encode(), self.body_suffix))
+
+def get_order_template(base_url, access_token, app_key, app_secret, account_no, stock_code, tr_id, ord_dvsn="01"):
+    """주문 템플릿 조회 (없으면 생성, 토큰이 바뀌면 새 템플릿)"""
+    key = (base_url, access_token, app_key, account_no, stock_code, tr_id, ord_dvsn)
+    with _template_lock:
+        template = _order_templates.get(key)
+        if template is not None:
+            _order_templates.move_to_end(key)
+            return template
+
+    try:
+        template = OrderTemplate(base_url, access_token, app_key, app_secret, account_no, stock_code, tr_id, ord_dvsn)
+    except ValueError:
+        print("❌ ACCOUNT_NO 포맷 오류 (예: '50154524-01')")
+        return None
+
+    with _template_lock:
+        _order_templates[key] = template
+        while len(_order_templates) > ORDER_TEMPLATE_CACHE_SIZE:
+            _order_templates.popitem(last=False)
+    return template
+
+# --------------------------------------------------------------
+def _order_cash(access_token, base_url, app_key, app_secret, account_no, stock_code, quantity, tr_id, side_name, use_hashkey, signal_ns):
+    """현금 시장가 주문 공통 처리 (구간별 지연을 order_latency 에 기록)"""
+    start_ns = time.perf_counter_ns()
+    template = get_order_template(base_url, access_token, app_key, app_secret, account_no, stock_code, tr_id)
+    if template is None:
+        return None
+
+    body = template.render(quantity)
+    headers = template.headers
 
-    response = requests.post(url, headers=headers, data=json.dumps(data))
+    if use_hashkey is None:
+        use_hashkey = USE_HASHKEY
+    if use_hashkey:
+        t0 = time.perf_counter_ns()
+        hashkey = get_cached_hashkey(body, base_url, app_key, app_secret)
+        order_latency.record_since("hashkey", t0)
+        if not hashkey:
+            return None
+        headers = dict(headers, hashkey=hashkey)
+
+    t0 = time.perf_counter_ns()
+    response = get_session().post(template.url, headers=headers, data=body)
+    t0 = order_latency.record_since("order_post", t0)
     if response.status_code == 200:
         result = response.json()
+        ack_ns = order_latency.record_since("json_decode", t0)
+        order_latency.record("order_total", ack_ns - start_ns)
+        if signal_ns is not None:
+            order_latency.record("signal_to_ack", ack_ns - signal_ns)
         if result.get("rt_cd") == "0":
             odno = result.get("output", {}).get("ODNO")
-            print(f"✅ 매수 주문 성공! (주문번호: {odno})")
+            print(f"✅ {side_name} 주문 성공! (주문번호: {odno})")
         else:
-            print(f"❌ 매수 주문 실패: {result.get('msg1')}")
+            print(f"❌ {side_name} 주문 실패: {result.get('msg1')}")
         return result
     else:
-        print(f"❌ 매수 API 호출 실패: {response.text}")
+        print(f"❌ {side_name} API 호출 실패: {response.text}")
         return None
 
 # --------------------------------------------------------------
-def sell_etf(access_token, base_url, app_key, app_secret, account_no, stock_code, quantity, stock_name, tr_id="VTTC0801U"):
+def buy_etf(access_token, base_url, app_key, app_secret, account_no, stock_code, quantity, stock_name, tr_id="VTTC0802U", use_hashkey=None, signal_ns=None):
+    """시장가 매수 주문 (모듈화된 함수)"""
+    print(f"\n>>>> 🛒 {stock_name} {quantity}주 시장가 매수 주문 실행!")
+    return _order_cash(access_token, base_url, app_key, app_secret, account_no,
+                       stock_code, quantity, tr_id, "매수", use_hashkey, signal_ns)
+
+# --------------------------------------------------------------
+def sell_etf(access_token, base_url, app_key, app_secret, account_no, stock_code, quantity, stock_name, tr_id="VTTC0801U", use_hashkey=None, signal_ns=None):
     """시장가 매도 주문 (모듈화된 함수)"""
     print(f"\n>>>> 💰 {stock_name} {quantity}주 시장가 매도 주문 실행!")
-    path = "/uapi/domestic-stock/v1/trading/order-cash"
-    url = f"{base_url}{path}"
+    return _order_cash(access_token, base_url, app_key, app_secret, account_no,
+                       stock_code, quantity, tr_id, "매도", use_hashkey, signal_ns)
 
-    try:
-        cano, acnt_prdt_cd = account_no.split('-')
-    except Exception:
-        print("❌ ACCOUNT_NO 포맷 오류 (예: '50154524-01')")
-        return None
+# --------------------------------------------------------------
+BASKET_MAX_IN_FLIGHT = 8  # 바스켓 주문 시 동시에 전송 중인 최대 주문 수 (유량은 전역 토큰 버킷이 관리)
 
-    data = {
-        "CANO": cano,
-        "ACNT_PRDT_CD": acnt_prdt_cd,
-        "PDNO": stock_code,
-        "ORD_DVSN": "01",  # 01: 시장가
-        "ORD_QTY": str(quantity),
-        "ORD_UNPR": "0",
+def _submit_basket(order_func, side_name, access_token, base_url, app_key, app_secret, account_no, basket_df, tr_id, max_in_flight):
+    """바스켓 구성 종목 주문을 동시에 전송하고 종목별 결과/소요시간 반환"""
+    legs = [
+        (row['종목명'], row['종목코드'], int(row['수량']))
+        for _, row in basket_df.iterrows()
+        if int(row['수량']) > 0
+    ]
+
+    order_results = {
+        "success": [],
+        "failed": [],
+        "legs": [],
+        "elapsed_ms": 0.0,
     }
+    if not legs:
+        print(f"⚠️ {side_name}할 바스켓 종목이 없습니다.")
+        return order_results
 
-    hashkey = get_hashkey(data, base_url, app_key, app_secret)
-    if not hashkey:
-        return None
+    def submit_leg(stock_name, stock_code, quantity):
+        t0 = time.perf_counter_ns()
+        try:
+            result = order_func(access_token, base_url, app_key, app_secret, account_no,
+                                stock_code, quantity, stock_name, tr_id=tr_id)
+            if result is None:
+                error = "API 호출 실패"
+            elif result.get("rt_cd") != "0":
+                error = result.get("msg1") or "주문 실패"
+            else:
+                error = None
+        except Exception as e:
+            result, error = None, str(e)
+        return {
+            "stock_name": stock_name,
+            "stock_code": stock_code,
+            "quantity": quantity,
+            "result": result,
+            "error": error,
+            "elapsed_ms": (time.perf_counter_ns() - t0) / 1e6,
+        }
 
-    headers = {
-        "content-type": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "appkey": app_key,
-        "appsecret": app_secret,
-        "tr_id": tr_id,
-        "custtype": "P",
-        "hashkey": hashkey
-    }
+    print(f"\n>>>> 🧺 바스켓 {len(legs)}종목 {side_name} 주문 동시 전송 (최대 {max_in_flight}건)")
+    basket_start_ns = time.perf_counter_ns()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(legs)))) as executor:
+        futures = [executor.submit(submit_leg, *leg) for leg in legs]
+        order_results["legs"] = [f.result() for f in futures]
+    elapsed_ns = time.perf_counter_ns() - basket_start_ns
+    order_results["elapsed_ms"] = elapsed_ns / 1e6
+    order_latency.record("basket_total", elapsed_ns)
 
-    response = requests.post(url, headers=headers, data=json.dumps(data))
-    if response.status_code == 200:
-        result = response.json()
-        if result.get("rt_cd") == "0":
-            odno = result.get("output", {}).get("ODNO")
-            print(f"✅ 매도 주문 성공! (주문번호: {odno})")
+    for leg in order_results["legs"]:
+        if leg["error"] is None:
+            order_results["success"].append(leg)
         else:
-            print(f"❌ 매도 주문 실패: {result.get('msg1')}")
-        return result
-    else:
-        print(f"❌ 매도 API 호출 실패: {response.text}")
-        return None
\ No newline at end of file
+            order_results["failed"].append(leg)
+    print(f"🧺 바스켓 {side_name} 완료: 성공 {len(order_results['success'])}건 / "
+          f"실패 {len(order_results['failed'])}건 ({order_results['elapsed_ms']:.1f}ms)")
+    return order_results
+
+# --------------------------------------------------------------
+def buy_basket(access_token, base_url, app_key, app_secret, account_no, basket_df, tr_id="VTTC0802U", max_in_flight=BASKET_MAX_IN_FLIGHT):
+    """바스켓 시장가 매수 (make_basket.create_minimum_cost_portfolio 결과 DataFrame 사용)"""
+    return _submit_basket(buy_etf, "매수", access_token, base_url, app_key, app_secret,
+                          account_no, basket_df, tr_id, max_in_flight)
+
+# --------------------------------------------------------------
+def sell_basket(access_token, base_url, app_key, app_secret, account_no, basket_df, tr_id="VTTC0801U", max_in_flight=BASKET_MAX_IN_FLIGHT):
+    """바스켓 시장가 매도 (make_basket.create_minimum_cost_portfolio 결과 DataFrame 사용)"""
+    return _submit_basket(sell_etf, "매도", access_token, base_url, app_key, app_secret,
+                          account_no, basket_df, tr_id, max_in_flight)
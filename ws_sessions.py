@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import time
+
+import websockets
+import websockets.exceptions
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# ========== 웹소켓 세션 분산 (세션당 실시간 등록 한도 대응) ==========
+# ==============================================================================
+# KIS 는 웹소켓 세션 하나에 실시간 등록을 MAX_REGISTRATIONS_PER_SESSION 건까지만 허용합니다.
+# 종목 하나가 feeds_per_symbol 건(예: 체결가 + 호가 = 2건)을 쓰므로, 한도를 넘으면 세션을 더 열어
+# 종목을 나눠 담고, 모든 세션의 수신 프레임은 하나의 큐로 합쳐 도착 순서대로 recv() 로 내보냅니다.
+# recv()/pong()/close()/closed 를 제공하므로 KISWebSocketClient.listen 은 단일 연결처럼 사용합니다.
+MAX_REGISTRATIONS_PER_SESSION = 41
+SUBSCRIBE_INTERVAL = 0.1  # 종목 간 구독 요청 간격 (초)
+RECONNECT_DELAY = 5.0     # 세션 끊김 시 재연결 대기 (초)
+
+
+class _Session:
+    """웹소켓 연결 1개와 그 연결에 등록된 종목"""
+
+    def __init__(self, sid, ws):
+        self.sid = sid
+        self.ws = ws
+        self.codes = set()
+        self.task = None
+        self.retired = False  # 재배치로 닫는 중 (재연결하지 않음)
+
+
+class WebSocketSessionManager:
+    """종목 구독을 여러 웹소켓 세션에 나눠 담고 수신 프레임을 하나의 스트림으로 병합
+
+    subscribe_messages(code, tr_type) 는 종목 1개의 등록("1")/해제("2") 메시지 목록을 반환해야 합니다.
+    """
+
+    def __init__(self, url, subscribe_messages, feeds_per_symbol=2,
+                 max_registrations=MAX_REGISTRATIONS_PER_SESSION, connect=None,
+                 subscribe_interval=SUBSCRIBE_INTERVAL, reconnect_delay=RECONNECT_DELAY):
+        self.url = url
+        self.subscribe_messages = subscribe_messages
+        self.capacity = max(1, max_registrations // feeds_per_symbol)  # 세션당 종목 수
+        self.subscribe_interval = subscribe_interval
+        self.reconnect_delay = reconnect_delay
+        self._connect = connect or (lambda url: websockets.connect(url, ping_interval=30, ping_timeout=10))
+        self.sessions = []
+        self.assignment = {}  # 종목코드 → _Session
+        self._queue = asyncio.Queue()  # (수신 monotonic_ns, 세션 번호, 프레임)
+        self._lock = asyncio.Lock()    # 구독 변경 직렬화
+        self._next_sid = 0
+        self._last_sid = None
+        self.last_recv_ns = None
+        self._closed = False
+
+    # ---------------- 세션 관리 ----------------
+    async def open_session(self):
+        ws = await self._connect(self.url)
+        session = _Session(self._next_sid, ws)
+        self._next_sid += 1
+        session.task = asyncio.create_task(self._reader(session))
+        self.sessions.append(session)
+        logger.info(f"웹소켓 세션 #{session.sid} 연결: {self.url} (세션 {len(self.sessions)}개)")
+        return session
+
+    async def _retire(self, session):
+        """세션 닫기 (닫으면 그 세션의 등록도 서버에서 해제됨)"""
+        session.retired = True
+        self.sessions.remove(session)
+        session.task.cancel()
+        await session.ws.close()
+        logger.info(f"웹소켓 세션 #{session.sid} 종료 (세션 {len(self.sessions)}개)")
+
+    async def _reader(self, session):
+        """세션 수신 루프: 프레임에 수신 시각을 찍어 공용 큐에 넣음 (끊기면 재연결 후 재등록)"""
+        while not (self._closed or session.retired):
+            try:
+                message = await session.ws.recv()
+            except websockets.exceptions.ConnectionClosed:
+                if self._closed or session.retired:
+                    return
+                logger.warning(f"웹소켓 세션 #{session.sid} 연결 종료, {self.reconnect_delay:g}초 후 재연결")
+                await asyncio.sleep(self.reconnect_delay)
+                try:
+                    session.ws = await self._connect(self.url)
+                except (OSError, websockets.exceptions.WebSocketException) as e:
+                    logger.error(f"웹소켓 세션 #{session.sid} 재연결 실패: {e}")
+                    continue
+                await self._send(session, list(session.codes), "1")
+                continue
+            self._queue.put_nowait((time.monotonic_ns(), session.sid, message))
+
+    async def _send(self, session, codes, tr_type):
+        for code in codes:
+            try:
+                for msg in self.subscribe_messages(code, tr_type):
+                    await session.ws.send(msg)
+            except websockets.exceptions.ConnectionClosed:
+                return  # 재연결 시 session.codes 전체를 다시 등록함
+            await asyncio.sleep(self.subscribe_interval)
+
+    def _least_loaded(self):
+        """여유가 있는 세션 중 등록 종목이 가장 적은 세션 (없으면 None)"""
+        candidates = [s for s in self.sessions if len(s.codes) < self.capacity]
+        return min(candidates, key=lambda s: len(s.codes)) if candidates else None
+
+    async def _place(self, codes):
+        """종목들을 세션에 배정하고 세션별로 등록 요청"""
+        batches = {}
+        for code in codes:
+            session = self._least_loaded() or await self.open_session()
+            session.codes.add(code)
+            self.assignment[code] = session
+            batches.setdefault(session, []).append(code)
+        for session, batch in batches.items():
+            await self._send(session, batch, "1")
+            logger.info(f"웹소켓 세션 #{session.sid} 구독 {len(batch)}개 (등록 {len(session.codes)}/{self.capacity}종목)")
+
+    # ---------------- 구독 ----------------
+    async def subscribe(self, codes):
+        async with self._lock:
+            new = [code for code in dict.fromkeys(codes) if code not in self.assignment]
+            await self._place(new)
+
+    async def unsubscribe(self, codes):
+        async with self._lock:
+            for code in dict.fromkeys(codes):
+                session = self.assignment.pop(code, None)
+                if session is None:
+                    continue
+                session.codes.discard(code)
+                await self._send(session, [code], "2")
+            await self._rebalance()
+
+    async def _rebalance(self):
+        """필요한 세션 수보다 많으면 등록이 가장 적은 세션을 닫고 종목을 다른 세션으로 옮김"""
+        needed = max(1, -(-len(self.assignment) // self.capacity))
+        while len(self.sessions) > needed:
+            victim = min(self.sessions, key=lambda s: len(s.codes))
+            moved = list(victim.codes)
+            await self._retire(victim)
+            await self._place(moved)
+
+    # ---------------- 병합 스트림 ----------------
+    async def recv(self):
+        """모든 세션의 다음 프레임 (수신 순서)"""
+        if self._closed:
+            raise websockets.exceptions.ConnectionClosedOK(None, None)
+        self.last_recv_ns, self._last_sid, message = await self._queue.get()
+        return message
+
+    async def pong(self, data=b""):
+        """마지막으로 내보낸 프레임이 온 세션에 pong (끊긴 세션은 수신 루프가 재연결하므로 무시)"""
+        for session in self.sessions:
+            if session.sid == self._last_sid:
+                try:
+                    await session.ws.pong(data)
+                except websockets.exceptions.ConnectionClosed:
+                    pass
+                return
+
+    @property
+    def closed(self):
+        return self._closed or not self.sessions
+
+    def stats(self):
+        """세션 번호 → 등록 종목 수"""
+        return {session.sid: len(session.codes) for session in self.sessions}
+
+    async def close(self):
+        self._closed = True
+        for session in list(self.sessions):
+            await self._retire(session)
+        self.assignment.clear()